@@ -0,0 +1,263 @@
+import json
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import (CaptureQueriesContext, setup_test_environment,
+                               teardown_test_environment)
+
+from rest_framework.test import APIClient
+
+from recipe.models import Ingredient, Recipe, Tag, User
+
+from foodgram.settings import BENCHMARK_BASELINE
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+
+def benchmark_steps(context):
+    recipe = {
+        'name': 'Бенчмарк',
+        'text': 'Рецепт для замеров',
+        'cooking_time': 10,
+        'tags': [context['tag']],
+        'ingredients': [
+            {'id': context['ingredient'], 'amount': 10},
+        ],
+    }
+    return (
+        ('tags', 'get', '/api/tags/', None),
+        ('tag', 'get', '/api/tags/{tag}/', None),
+        ('ingredients', 'get', '/api/ingredients/', None),
+        ('ingredient search', 'get',
+         '/api/ingredients/?name={ingredient_prefix}', None),
+        ('ingredient', 'get', '/api/ingredients/{ingredient}/', None),
+        ('recipes', 'get', '/api/recipes/', None),
+        ('recipes, page 10', 'get', '/api/recipes/?page=10', None),
+        ('recipes, cursor', 'get', '/api/recipes/?cursor=&count=1', None),
+        ('recipes by tag', 'get', '/api/recipes/?tags={tag_slug}', None),
+        ('recipes by two tags', 'get',
+         '/api/recipes/?tags={tag_slug}&tags={other_tag_slug}', None),
+        ('recipes by author', 'get', '/api/recipes/?author={author}', None),
+        ('favorite recipes', 'get', '/api/recipes/?is_favorited=1', None),
+        ('recipes in cart', 'get', '/api/recipes/?is_in_shopping_cart=1',
+         None),
+        ('recipe', 'get', '/api/recipes/{recipe}/', None),
+        ('add favorite', 'post', '/api/recipes/{other_recipe}/favorite/',
+         None),
+        ('remove favorite', 'delete',
+         '/api/recipes/{other_recipe}/favorite/', None),
+        ('add to cart', 'post', '/api/recipes/{other_recipe}/shopping_cart/',
+         None),
+        ('remove from cart', 'delete',
+         '/api/recipes/{other_recipe}/shopping_cart/', None),
+        ('shopping list, txt', 'get',
+         '/api/recipes/download_shopping_cart/?format=txt', None),
+        ('shopping list, csv', 'get',
+         '/api/recipes/download_shopping_cart/?format=csv', None),
+        ('shopping list, pdf', 'get',
+         '/api/recipes/download_shopping_cart/?format=pdf', None),
+        ('create recipe', 'post', '/api/recipes/', recipe),
+        ('update recipe', 'patch', '/api/recipes/{new_recipe}/', recipe),
+        ('delete recipe', 'delete', '/api/recipes/{new_recipe}/', None),
+        ('subscriptions', 'get', '/api/users/subscriptions/', None),
+        ('subscribe', 'post', '/api/users/{other_author}/subscribe/', None),
+        ('unsubscribe', 'delete', '/api/users/{other_author}/subscribe/',
+         None),
+        ('users', 'get', '/api/users/', None),
+        ('user', 'get', '/api/users/{author}/', None),
+        ('current user', 'get', '/api/users/me/', None),
+        ('sign up', 'post', '/api/users/', {
+            'email': 'benchmark{iteration}@example.com',
+            'username': 'benchmark{iteration}',
+            'first_name': 'Бенчмарк',
+            'last_name': 'Бенчмарк',
+            'password': BENCHMARK_PASSWORD,
+        }),
+        ('log in', 'post', '/api/auth/token/login/', {
+            'email': '{email}',
+            'password': BENCHMARK_PASSWORD,
+        }),
+    )
+
+
+def fill(value, context):
+    if isinstance(value, str):
+        return value.format(**context)
+    if isinstance(value, dict):
+        return {key: fill(item, context) for key, item in value.items()}
+    if isinstance(value, list):
+        return [fill(item, context) for item in value]
+    return value
+
+
+class Command(BaseCommand):
+    help = ('Замеряет число SQL-запросов, время и память для маршрутов API '
+            'на заполненной базе. С эталоном сравнивается только число '
+            'запросов: время и память зависят от машины и выводятся '
+            'для справки')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int,
+            help='id пользователя, от имени которого идут запросы'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='сколько раз замерить каждый запрос после прогрева'
+        )
+        parser.add_argument(
+            '--baseline', default=str(BENCHMARK_BASELINE),
+            help='путь к файлу эталона'
+        )
+        parser.add_argument(
+            '--save', action='store_true',
+            help='сохранить результаты как новый эталон'
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            with transaction.atomic():
+                results = self.run(options)
+                transaction.set_rollback(True)
+        finally:
+            teardown_test_environment()
+        if options['save']:
+            with open(options['baseline'], 'w', encoding='utf-8') as file:
+                json.dump(
+                    {name: result['queries']
+                     for name, result in results.items()},
+                    file, ensure_ascii=False, indent=2,
+                )
+                file.write('\n')
+            self.stdout.write(f'Эталон сохранён в {options["baseline"]}')
+            return
+        try:
+            with open(options['baseline'], encoding='utf-8') as file:
+                baseline = json.load(file)
+        except FileNotFoundError:
+            raise CommandError(
+                'Нет файла эталона: запустите команду с --save'
+            )
+        regressions = self.compare(results, baseline)
+        if regressions:
+            raise CommandError(
+                'Регрессии: ' + ', '.join(sorted(set(regressions)))
+            )
+
+    def get_context(self, user_id):
+        users = User.objects.filter(
+            in_cart__isnull=False, follower__isnull=False
+        ).order_by('id')
+        if user_id:
+            users = User.objects.filter(id=user_id)
+        user = users.first()
+        if user is None:
+            raise CommandError('Нет подходящего пользователя: запустите '
+                               'seed_scale или укажите --user')
+        user.set_password(BENCHMARK_PASSWORD)
+        user.save(update_fields=('password',))
+        tags = list(Tag.objects.order_by('id')[:2])
+        ingredient = Ingredient.objects.order_by('id').first()
+        recipe = Recipe.recipes.order_by('-created_at').first()
+        other_recipe = Recipe.recipes.exclude(
+            favorite_recipe__user=user
+        ).exclude(in_cart__user=user).exclude(author=user).first()
+        other_author = User.objects.exclude(
+            following__user=user
+        ).exclude(id=user.id).order_by('id').first()
+        if len(tags) < 2 or None in (
+            ingredient, recipe, other_recipe, other_author
+        ):
+            raise CommandError('База не заполнена: запустите seed_scale')
+        tag, other_tag = tags
+        return user, {
+            'email': user.email,
+            'tag': tag.id,
+            'tag_slug': tag.slug,
+            'other_tag_slug': other_tag.slug,
+            'ingredient': ingredient.id,
+            'ingredient_prefix': ingredient.name[:3],
+            'recipe': recipe.id,
+            'author': recipe.author_id,
+            'other_recipe': other_recipe.id,
+            'other_author': other_author.id,
+        }
+
+    def request(self, client, step, context):
+        name, method, path, data = step
+        response = getattr(client, method)(
+            fill(path, context), fill(data, context), format='json'
+        )
+        if response.streaming:
+            b''.join(response.streaming_content)
+        if response.status_code >= 400:
+            raise CommandError(
+                f'{name}: {response.status_code} {response.content[:200]!r}'
+            )
+        if name == 'create recipe':
+            context['new_recipe'] = response.json()['id']
+        return response
+
+    def run(self, options):
+        user, context = self.get_context(options['user'])
+        client = APIClient()
+        client.force_authenticate(user)
+        steps = benchmark_steps(context)
+        queries = {name: 0 for name, *_ in steps}
+        timings = {name: [] for name, *_ in steps}
+        allocations = {}
+        for iteration in range(options['repeat'] + 2):
+            context['iteration'] = iteration
+            warm_up = iteration == 0
+            trace = iteration == options['repeat'] + 1
+            for step in steps:
+                name = step[0]
+                if trace:
+                    tracemalloc.start()
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    self.request(client, step, context)
+                    elapsed = time.perf_counter() - started
+                if trace:
+                    allocations[name] = round(
+                        tracemalloc.get_traced_memory()[1] / 1024, 1
+                    )
+                    tracemalloc.stop()
+                elif not warm_up:
+                    timings[name].append(elapsed * 1000)
+                # Прогрев создаёт то, что появляется один раз, например
+                # токен при первом входе, поэтому его запросы не считаются.
+                if not warm_up:
+                    queries[name] = max(queries[name], len(captured))
+        return {
+            name: {
+                'queries': queries[name],
+                'time_ms': round(statistics.median(timings[name]), 1),
+                'alloc_kib': allocations[name],
+            } for name, *_ in steps
+        }
+
+    def compare(self, results, baseline):
+        regressions = []
+        self.stdout.write(
+            f'{"маршрут":24} {"запросы":>12} {"мс":>8} {"КиБ":>9}'
+        )
+        for name, result in results.items():
+            base = baseline.get(name)
+            line = (
+                f'{name:24} {result["queries"]:>5} '
+                f'({"-" if base is None else base:>4}) '
+                f'{result["time_ms"]:>8} {result["alloc_kib"]:>9}'
+            )
+            if base is None:
+                self.stdout.write(f'{line} нет в эталоне')
+            elif result['queries'] > base:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        return regressions
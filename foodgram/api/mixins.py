@@ -0,0 +1,74 @@
+import hashlib
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from api.recipes.serializers import BatchSerializer
+from recipe.batch import add_relations, remove_relations
+from recipe.versions import get_version
+
+from foodgram.settings import REFERENCE_CACHE_MAX_AGE
+
+REFERENCE_CACHE_KEY = 'reference:{}'
+
+
+class CachedReferenceMixin:
+    version_key = None
+
+    def get_reference_etag(self):
+        version = ':'.join((
+            self.version_key,
+            get_version(self.version_key),
+            self.action,
+            str(self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)),
+        ))
+        return '"{}"'.format(hashlib.md5(version.encode()).hexdigest())
+
+    def cached_response(self, method, request, *args, **kwargs):
+        etag = self.get_reference_etag()
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            key = REFERENCE_CACHE_KEY.format(etag.strip('"'))
+            data = cache.get(key)
+            if data is None:
+                data = method(request, *args, **kwargs).data
+                cache.set(key, data, REFERENCE_CACHE_MAX_AGE)
+            response = Response(data)
+        response['ETag'] = etag
+        patch_cache_control(
+            response, public=True, max_age=REFERENCE_CACHE_MAX_AGE
+        )
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class BatchRelationMixin:
+    """Добавляет и удаляет связи пользователя с объектами по списку id.
+
+    В ответе для каждого id указан результат: created, exists, deleted,
+    missing, not_found или forbidden.
+    """
+
+    def batch_relations(self, request, model, forbidden=()):
+        serializer = BatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        ids = serializer.validated_data['ids']
+        if request.method == 'DELETE':
+            results = remove_relations(model, request.user, ids)
+        else:
+            results = add_relations(model, request.user, ids, forbidden)
+        return Response(results)
@@ -0,0 +1,98 @@
+import base64
+import binascii
+import datetime
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from foodgram.settings import (RECIPE_COUNT_CACHE_TIMEOUT, RECIPE_MAX_ON_PAGE,
+                               RECIPE_ON_PAGE)
+
+RECIPE_COUNT_KEY = 'recipe_count:{}'
+
+
+class RecipePagination(pagination.PageNumberPagination):
+    page_size = RECIPE_ON_PAGE
+    page_size_query_param = 'limit'
+    max_page_size = RECIPE_MAX_ON_PAGE
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Неверный курсор'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+        self.count = None
+        if request.query_params.get(self.count_query_param):
+            self.count = self.get_cached_count(queryset, view)
+        queryset = queryset.order_by('-created_at', '-id')
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            created_at, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at)
+                | Q(created_at=created_at, id__lt=pk)
+            )
+        page_size = self.get_page_size(request)
+        page = list(queryset[:page_size + 1])
+        self.has_next = len(page) > page_size
+        self.page_objects = page[:page_size]
+        return self.page_objects
+
+    def get_cached_count(self, queryset, view):
+        key = RECIPE_COUNT_KEY.format(view.recipe_filter.key)
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, RECIPE_COUNT_CACHE_TIMEOUT)
+        return count
+
+    def encode_cursor(self, recipe):
+        position = f'{recipe.created_at.isoformat()}|{recipe.id}'
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            created_at, pk = base64.urlsafe_b64decode(
+                cursor.encode()
+            ).decode().split('|')
+            return datetime.datetime.fromisoformat(created_at), int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_cursor_link(self):
+        if not self.has_next:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(
+            url, self.cursor_query_param,
+            self.encode_cursor(self.page_objects[-1])
+        )
+
+    def get_envelope(self):
+        if not self.use_cursor:
+            return OrderedDict([
+                ('count', self.page.paginator.count),
+                ('next', self.get_next_link()),
+                ('previous', self.get_previous_link()),
+            ])
+        envelope = OrderedDict()
+        if self.count is not None:
+            envelope['count'] = self.count
+        envelope['next'] = self.get_next_cursor_link()
+        return envelope
+
+    def get_paginated_response(self, data):
+        envelope = self.get_envelope()
+        envelope['results'] = data
+        return Response(envelope)
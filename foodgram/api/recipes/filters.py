@@ -0,0 +1,62 @@
+import hashlib
+
+from rest_framework.exceptions import ValidationError
+
+FLAG_VALUES = {'1': True, 'true': True, '0': False, 'false': False}
+
+
+class RecipeFilter:
+    def __init__(self, query_params, user):
+        self.user = user
+        errors = {}
+        self.is_favorite = self.parse_flag(
+            query_params, 'is_favorited', errors
+        )
+        self.in_cart = self.parse_flag(
+            query_params, 'is_in_shopping_cart', errors
+        )
+        self.author = self.parse_author(query_params, errors)
+        self.tags = tuple(sorted(set(
+            tag for tag in query_params.getlist('tags') if tag
+        )))
+        if errors:
+            raise ValidationError(errors)
+
+    @staticmethod
+    def parse_flag(query_params, name, errors):
+        value = query_params.get(name)
+        if not value:
+            return False
+        if value.lower() not in FLAG_VALUES:
+            errors[name] = 'Допустимые значения: 0 или 1'
+            return False
+        return FLAG_VALUES[value.lower()]
+
+    @staticmethod
+    def parse_author(query_params, errors):
+        value = query_params.get('author')
+        if not value:
+            return None
+        if not value.isdigit():
+            errors['author'] = 'id автора должен быть числом'
+            return None
+        return int(value)
+
+    def as_kwargs(self):
+        return {
+            'is_favorite': self.is_favorite,
+            'in_cart': self.in_cart,
+            'author': self.author,
+            'tags': self.tags,
+        }
+
+    @property
+    def key(self):
+        user_id = None
+        if self.is_favorite or self.in_cart:
+            user_id = self.user.pk
+        filters = repr((user_id, sorted(self.as_kwargs().items())))
+        return hashlib.md5(filters.encode()).hexdigest()
+
+    def filter_queryset(self, queryset):
+        return queryset.recipe_filter(user=self.user, **self.as_kwargs())
@@ -1,25 +1,20 @@
-import base64
-
 from django.core.exceptions import ValidationError
-from django.core.files.base import ContentFile
-from django.db import models, transaction
+from django.db import transaction
 
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
-from recipe.service import (
-    ingredients_validator,
-    ingredient_amount,
-    tags_validator
-)
-from api.users.serializers import UserSerializer
+from recipe.service import ingredient_amount, recipe_validator
+from api.users.serializers import UserSerializer, get_following_ids
+from recipe.images import (check_image_pixels, decode_base64_image,
+                           variant_urls)
 from recipe.models import Cart, Favorites, Ingredient, Recipe, Tag, User
-from user.models import Follow
+
+from foodgram.settings import BATCH_MAX_SIZE, RECIPES_LIMIT
 
 
 class FollowSerializer(serializers.ModelSerializer):
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
     is_following = serializers.SerializerMethodField()
 
     class Meta:
@@ -30,27 +25,26 @@ class FollowSerializer(serializers.ModelSerializer):
         )
 
     def get_is_following(self, user):
-        current_user = self.context.get('current_user')
-        other_user = user.following.all()
-        if user.is_anonymous:
-            return False
-        if other_user.count() == 0:
+        """Подписан ли текущий пользователь на автора."""
+        if hasattr(user, 'is_following'):
+            return user.is_following
+        request = self.context.get('request')
+        if request is None or request.user.is_anonymous:
             return False
-        if Follow.objects.filter(user=user, following=current_user).exists():
-            return True
-        return False
+        return user.id in get_following_ids(request)
 
     def get_recipes(self, obj):
-        recipes = obj.recipes.all()[:3]
         request = self.context.get('request')
+        recipes = getattr(obj, 'latest_recipes', None)
+        if recipes is None:
+            recipes = obj.recipes.with_user_flags(
+                request.user
+            ).with_related()[:RECIPES_LIMIT]
         return RecipeSerializer(
             recipes, many=True,
             context={'request': request}
         ).data
 
-    def get_recipes_count(self, obj):
-        return obj.recipes.count()
-
 
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
@@ -69,11 +63,9 @@ class IngredientSerializer(serializers.ModelSerializer):
 class Base64ImageField(serializers.ImageField):
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith('data:image'):
-            format, imgstr = data.split(';base64,')
-            ext = format.split('/')[-1]
-            data = ContentFile(base64.b64decode(imgstr), name='temp.' + ext)
+            data = decode_base64_image(data)
 
-        return super().to_internal_value(data)
+        return check_image_pixels(super().to_internal_value(data))
 
 
 class RecipeSerializer(serializers.ModelSerializer):
@@ -83,6 +75,7 @@ class RecipeSerializer(serializers.ModelSerializer):
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
     image = Base64ImageField(required=False, allow_null=True)
+    images = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
@@ -93,8 +86,10 @@ class RecipeSerializer(serializers.ModelSerializer):
             'ingredients',
             'is_favorited',
             'is_in_shopping_cart',
+            'favorites_count',
             'name',
             'image',
+            'images',
             'text',
             'cooking_time',
         )
@@ -104,8 +99,7 @@ class RecipeSerializer(serializers.ModelSerializer):
         ingredients = self.initial_data.get('ingredients')
         if not tags or not ingredients:
             raise ValidationError('Недостаточно данных.')
-        tags_validator(tags, Tag)
-        ingredients = ingredients_validator(ingredients, Ingredient)
+        tags, ingredients = recipe_validator(tags, ingredients)
         data.update({
             'tags': tags,
             'ingredients': ingredients,
@@ -114,10 +108,37 @@ class RecipeSerializer(serializers.ModelSerializer):
         return data
 
     def get_ingredients(self, recipe):
-        ingredients = recipe.ingredients.values(
-            'id', 'name', 'measurement_unit', amount=models.F('recipe__amount')
-        )
-        return ingredients
+        amounts = getattr(recipe, 'ingredient_amounts', None)
+        if amounts is None:
+            amounts = recipe.ingredients_in_recipe.select_related(
+                'ingredients'
+            ).order_by('ingredients__name')
+        return [
+            {
+                'id': amount.ingredients.id,
+                'name': amount.ingredients.name,
+                'measurement_unit': amount.ingredients.measurement_unit,
+                'amount': amount.amount,
+            } for amount in amounts
+        ]
+
+    def get_images(self, recipe):
+        urls = variant_urls(recipe)
+        request = self.context.get('request')
+        if request is None:
+            return urls
+        return {
+            variant: request.build_absolute_uri(url)
+            for variant, url in urls.items()
+        }
+
+    def save(self, **kwargs):
+        try:
+            return super().save(**kwargs)
+        finally:
+            image = self.validated_data.get('image')
+            if image is not None:
+                image.close()
 
     @transaction.atomic
     def create(self, validated_data):
@@ -125,7 +146,7 @@ class RecipeSerializer(serializers.ModelSerializer):
         tags = validated_data.pop('tags')
         recipe = Recipe.recipes.create(**validated_data)
         recipe.tags.set(tags)
-        ingredient_amount(recipe, ingredients)
+        ingredient_amount(recipe, ingredients, created=True)
         return recipe
 
     @transaction.atomic
@@ -135,16 +156,15 @@ class RecipeSerializer(serializers.ModelSerializer):
         for key, value in validated_data.items():
             if hasattr(recipe, key):
                 setattr(recipe, key, value)
-        if tags:
-            recipe.tags.clear()
-            recipe.tags.set(tags)
-        if ingredients:
-            recipe.ingredients.clear()
-            ingredient_amount(recipe, ingredients)
+        recipe.tags.set(tags)
+        ingredient_amount(recipe, ingredients)
+        recipe.ingredient_amounts = None
         recipe.save()
         return recipe
 
     def get_is_favorited(self, recipe):
+        if hasattr(recipe, 'is_favorited'):
+            return recipe.is_favorited
         request = self.context.get('request')
         if request is None or request.user.is_anonymous:
             return False
@@ -152,6 +172,8 @@ class RecipeSerializer(serializers.ModelSerializer):
         return Favorites.objects.filter(recipe=recipe, user=user).exists()
 
     def get_is_in_shopping_cart(self, recipe):
+        if hasattr(recipe, 'is_in_shopping_cart'):
+            return recipe.is_in_shopping_cart
         request = self.context.get('request')
         if request is None or request.user.is_anonymous:
             return False
@@ -172,9 +194,13 @@ class FavoritesSerializer(serializers.ModelSerializer):
         ]
 
     def to_representation(self, instance):
+        request = self.context.get('request')
+        recipe = Recipe.recipes.with_user_flags(
+            request.user
+        ).with_related().get(pk=instance.recipe_id)
         return RecipeSerializer(
-            instance.recipe,
-            context={'request': self.context.get('request')}
+            recipe,
+            context={'request': request}
         ).data
 
 
@@ -191,7 +217,22 @@ class CartSerializer(serializers.ModelSerializer):
         ]
 
     def to_representation(self, instance):
+        request = self.context.get('request')
+        recipe = Recipe.recipes.with_user_flags(
+            request.user
+        ).with_related().get(pk=instance.recipe_id)
         return RecipeSerializer(
-            instance.recipe,
-            context={'request': self.context.get('request')}
+            recipe,
+            context={'request': request}
         ).data
+
+
+class BatchSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BATCH_MAX_SIZE,
+    )
+
+    def validate_ids(self, ids):
+        return list(dict.fromkeys(ids))
@@ -1,36 +1,103 @@
-import datetime
+import hashlib
+from functools import cached_property
 
+from django.db.models import prefetch_related_objects
 from django.shortcuts import get_object_or_404
-from django.http import FileResponse
+from django.http import HttpResponse
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers)
 
-from rest_framework import pagination, status, viewsets
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from api.mixins import BatchRelationMixin, CachedReferenceMixin
+from api.pagination import RecipePagination
 from api.permissions import AdminOrReadOnly, IsAuthorAdminOrReadOnlyPermission
+from api.users.serializers import get_following_ids
+from .filters import RecipeFilter
+from .renderers import SHOPPING_LIST_RENDERERS
 from .serializers import (CartSerializer, FavoritesSerializer,
                           IngredientSerializer, RecipeSerializer,
                           TagSerializer)
-from recipe.models import (Cart, Favorites, Ingredient, IngredientAmount,
-                           Recipe, Tag)
+from recipe.ingredient_index import get_ingredient_index
+from recipe.models import (Cart, Favorites, Ingredient, Recipe, Tag,
+                           recipe_prefetches)
+from recipe.shopping_list import get_shopping_list, shopping_list_etag
+from recipe.versions import INGREDIENTS_VERSION_KEY, TAGS_VERSION_KEY
 
-from foodgram.settings import RECIPE_ON_PAGE
 
-
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(BatchRelationMixin, viewsets.ModelViewSet):
     queryset = Recipe.recipes.select_related('author')
     serializer_class = RecipeSerializer
     permission_classes = (IsAuthorAdminOrReadOnlyPermission,)
-    pagination_class = pagination.PageNumberPagination
-    pagination_class.page_size = RECIPE_ON_PAGE
+    pagination_class = RecipePagination
+
+    @cached_property
+    def recipe_filter(self):
+        return RecipeFilter(self.request.query_params, self.request.user)
 
     def get_queryset(self):
-        return Recipe.recipes.recipe_filter(
-            user=self.request.user,
-            is_favorite=self.request.query_params.get('is_favorited'),
-            in_cart=self.request.query_params.get('is_in_shopping_cart'),
-            author=self.request.query_params.get('author'),
-        ).recipe_tag_filter(tags=self.request.query_params.getlist('tags'))
+        return self.recipe_filter.filter_queryset(
+            Recipe.recipes.all()
+        ).with_user_flags(self.request.user).select_related('author')
+
+    def get_recipes_etag(self, recipes, *extra):
+        user = self.request.user
+        following_ids = (
+            get_following_ids(self.request) if user.is_authenticated else ()
+        )
+        validator = repr((extra, [
+            (
+                recipe.id,
+                recipe.updated_at.isoformat(),
+                recipe.is_favorited,
+                recipe.is_in_shopping_cart,
+                recipe.favorites_count,
+                recipe.author_id in following_ids,
+            ) for recipe in recipes
+        ]))
+        return '"{}"'.format(hashlib.md5(validator.encode()).hexdigest())
+
+    def conditional_response(self, render, etag):
+        # Без Last-Modified: favorites_count меняется, не трогая
+        # updated_at, и проверка по дате вернула бы 304 со старым счётчиком.
+        response = get_conditional_response(self.request, etag=etag)
+        if response is None:
+            response = render()
+        response['ETag'] = etag
+        if self.request.user.is_authenticated:
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ('Authorization',))
+        else:
+            patch_cache_control(response, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        etag = self.get_recipes_etag(
+            page, self.recipe_filter.key, self.paginator.get_envelope()
+        )
+
+        def render():
+            prefetch_related_objects(page, *recipe_prefetches())
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        return self.conditional_response(render, etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+
+        def render():
+            prefetch_related_objects([instance], *recipe_prefetches())
+            return Response(self.get_serializer(instance).data)
+
+        return self.conditional_response(
+            render, self.get_recipes_etag((instance,))
+        )
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
@@ -87,66 +154,67 @@ class RecipeViewSet(viewsets.ModelViewSet):
         ).delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, methods=['post', 'delete'])
+    def batch_favorite(self, request):
+        return self.batch_relations(request, Favorites)
+
+    @action(detail=False, methods=['post', 'delete'])
+    def batch_cart(self, request):
+        return self.batch_relations(request, Cart)
+
+    def get_permissions(self):
+        if self.action == 'download_shopping_cart':
+            return (IsAuthenticated(),)
+        return super().get_permissions()
+
+    def get_renderers(self):
+        if self.action == 'download_shopping_cart':
+            return [renderer() for renderer in SHOPPING_LIST_RENDERERS]
+        return super().get_renderers()
+
     @action(detail=True)
     def download_shopping_cart(self, request):
-        ingredients = IngredientAmount.objects.filter(
-            recipe__in_cart__user=self.request.user
-        )
-        shopping_list = {}
-        filename = f'{request.user.username}_shopping_list.txt'
-        for ingredient in ingredients:
-            amount = ingredient.amount
-            name = ingredient.ingredients.name
-            measurement_unit = ingredient.ingredients.measurement_unit
-            if name not in shopping_list:
-                shopping_list[name] = {
-                    'measurement_unit': measurement_unit,
-                    'amount': amount
-                }
-            else:
-                shopping_list[name]['amount'] += amount
-        user_shopping_list = ([
-            f"{i + 1}. {item}: {value['amount']}"
-            f" {value['measurement_unit']}\n" for i, (
-                item, value
-            ) in enumerate(
-                shopping_list.items()
+        renderer = request.accepted_renderer
+        etag = shopping_list_etag(request.user, renderer.format)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                get_shopping_list(request.user, renderer.format, etag),
+                content_type=renderer.media_type + (
+                    f'; charset={renderer.charset}' if renderer.charset
+                    else ''
+                )
             )
-        ])
-        today = datetime.date.today()
-        user_shopping_list.append(
-            f'\nFoodgram by Samiel19, {today.strftime("%b-%d-%Y")}'
-        )
-        response = FileResponse(
-            user_shopping_list, content_type='text.txt; charset=utf-8'
-        )
-        response['Content-Disposition'] = f'attachment; filename={filename}'
+            filename = (f'{request.user.username}_shopping_list.'
+                        f'{renderer.format}')
+            response['Content-Disposition'] = (
+                f'attachment; filename={filename}'
+            )
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
         return response
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CachedReferenceMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (AdminOrReadOnly,)
+    authentication_classes = ()
+    version_key = TAGS_VERSION_KEY
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(CachedReferenceMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = (AdminOrReadOnly,)
-
-    def get_queryset(self):
-        name = self.request.query_params.get('name')
-        queryset = self.queryset
-
-        if name:
-            name = name.lower()
-            start_queryset = list(queryset.filter(name__istartswith=name))
-            ingridients_set = set(start_queryset)
-            cont_queryset = queryset.filter(name__icontains=name)
-            start_queryset.extend(
-                [ing for ing in cont_queryset if ing not in ingridients_set]
-            )
-            queryset = start_queryset
-
-        return queryset
+    authentication_classes = ()
+    version_key = INGREDIENTS_VERSION_KEY
+
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if not name:
+            return super().list(request, *args, **kwargs)
+        limit = request.query_params.get('limit')
+        return Response(get_ingredient_index().search(
+            name, int(limit) if limit and limit.isdigit() else None
+        ))
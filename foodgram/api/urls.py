@@ -1,11 +1,12 @@
 from django.conf import settings
 from django.conf.urls.static import static
-from django.urls import include, path
+from django.urls import include, path, re_path
 
 from rest_framework.routers import DefaultRouter
 
 from api.recipes.views import RecipeViewSet, TagViewSet, IngredientViewSet
 from api.users.views import UserViewSet
+from api.views import MetricsView
 
 router = DefaultRouter()
 
@@ -17,6 +18,10 @@ urlpatterns = [
     path('users/subscriptions/', UserViewSet.as_view(
         {'get': 'list'}
     )),
+    path('users/subscribe/', UserViewSet.as_view(
+        {'post': 'batch_follow',
+         'delete': 'batch_follow'}
+    )),
     path('users/<int:following_id>/subscribe/', UserViewSet.as_view(
         {'post': 'follow',
          'delete': 'unfollow'}
@@ -24,14 +29,23 @@ urlpatterns = [
     path('recipes/download_shopping_cart/', RecipeViewSet.as_view(
         {'get': 'download_shopping_cart'}
     )),
+    path('recipes/favorite/', RecipeViewSet.as_view(
+        {'post': 'batch_favorite',
+         'delete': 'batch_favorite'}
+    )),
     path('recipes/<int:favorite_id>/favorite/', RecipeViewSet.as_view(
         {'post': 'add_favorite',
          'delete': 'del_favorite'}
     )),
+    path('recipes/shopping_cart/', RecipeViewSet.as_view(
+        {'post': 'batch_cart',
+         'delete': 'batch_cart'}
+    )),
     path('recipes/<int:recipe_id>/shopping_cart/', RecipeViewSet.as_view(
         {'post': 'add_cart',
          'delete': 'del_cart'}
     )),
+    re_path(r'^metrics/?$', MetricsView.as_view(), name='metrics'),
     path('auth/', include('djoser.urls.authtoken')),
     path('', include(router.urls)),
     path('', include('djoser.urls')),
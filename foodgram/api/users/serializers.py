@@ -27,6 +27,18 @@ class CustomTokenCreateSerializer(TokenCreateSerializer):
         self.fail("invalid_credentials")
 
 
+def get_following_ids(request):
+    if not hasattr(request, '_following_ids'):
+        request._following_ids = set(Follow.objects.filter(
+            user=request.user
+        ).values_list('following_id', flat=True))
+    return request._following_ids
+
+
+def reset_following_ids(request):
+    request.__dict__.pop('_following_ids', None)
+
+
 class UserSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
 
@@ -45,10 +57,11 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = 'is_subscribed',
 
     def get_is_subscribed(self, obj):
-        user = self.context.get('request').user
+        request = self.context.get('request')
+        user = request.user
         if user.is_anonymous or (user == obj):
             return False
-        return Follow.objects.filter(following=obj, user=user).exists()
+        return obj.id in get_following_ids(request)
 
     def create(self, validated_data):
         user = User(
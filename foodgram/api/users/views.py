@@ -1,28 +1,46 @@
+from django.db.models import Exists, OuterRef, Prefetch
 from django.shortcuts import get_object_or_404
 
 from rest_framework import pagination, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from api.mixins import BatchRelationMixin
 from api.permissions import IsAuthorAdminOrReadOnlyPermission
-from .serializers import UserFollowSerializer
+from .serializers import UserFollowSerializer, reset_following_ids
 from api.recipes.serializers import FollowSerializer
-from recipe.models import User
+from recipe.models import Recipe, User
 from user.models import Follow
 
-from foodgram.settings import RECIPE_ON_PAGE
+from foodgram.settings import RECIPE_ON_PAGE, RECIPES_LIMIT
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(BatchRelationMixin, viewsets.ModelViewSet):
     serializer_class = FollowSerializer
     pagination_class = pagination.PageNumberPagination
     pagination_class.page_size = RECIPE_ON_PAGE
     permission_classes = (IsAuthorAdminOrReadOnlyPermission,)
 
     def get_queryset(self):
-        return User.objects.prefetch_related('follower').filter(
-            following__user=self.request.user
-        )
+        user = self.request.user
+        recipes = Recipe.recipes.latest_per_author(
+            self.get_recipes_limit()
+        ).with_user_flags(user).with_related()
+        return User.objects.filter(
+            following__user=user
+        ).annotate(
+            is_following=Exists(Follow.objects.filter(
+                user=user, following=OuterRef('pk')
+            )),
+        ).prefetch_related(
+            Prefetch('recipes', queryset=recipes, to_attr='latest_recipes')
+        ).order_by('id')
+
+    def get_recipes_limit(self):
+        recipes_limit = self.request.query_params.get('recipes_limit')
+        if recipes_limit and recipes_limit.isdigit():
+            return int(recipes_limit)
+        return RECIPES_LIMIT
 
     @action(detail=True, methods=['post'])
     def follow(self, request, following_id):
@@ -39,6 +57,7 @@ class UserViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         serializer.save()
+        reset_following_ids(request)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=['delete'])
@@ -47,4 +66,13 @@ class UserViewSet(viewsets.ModelViewSet):
         get_object_or_404(
             Follow, user=request.user, following=following
         ).delete()
+        reset_following_ids(request)
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=['post', 'delete'])
+    def batch_follow(self, request):
+        response = self.batch_relations(
+            request, Follow, forbidden=(request.user.id, )
+        )
+        reset_following_ids(request)
+        return response
@@ -0,0 +1,15 @@
+from django.http import HttpResponse
+
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+from foodgram.metrics import CONTENT_TYPE, registry, render_metrics
+
+
+class MetricsView(APIView):
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return HttpResponse(
+            render_metrics(*registry.collect()), content_type=CONTENT_TYPE
+        )
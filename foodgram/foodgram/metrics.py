@@ -0,0 +1,207 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from pathlib import Path
+
+from foodgram.settings import (METRICS_DIR, METRICS_FLUSH_INTERVAL,
+                               METRICS_LATENCY_BUCKETS, METRICS_SIZE_BUCKETS)
+
+logger = logging.getLogger('foodgram.metrics')
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+REQUESTS = 'foodgram_http_requests_total'
+LATENCY = 'foodgram_http_request_duration_seconds'
+SIZE = 'foodgram_http_response_size_bytes'
+COUNTERS = {
+    REQUESTS: 'Число запросов по представлению и коду ответа',
+}
+HISTOGRAMS = {
+    LATENCY: ('Время обработки запроса в секундах', METRICS_LATENCY_BUCKETS),
+    SIZE: ('Размер тела ответа в байтах', METRICS_SIZE_BUCKETS),
+}
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def file_pid(path):
+    try:
+        return int(path.name.split('-', 1)[0])
+    except ValueError:
+        return None
+
+
+class MetricsRegistry:
+    """Метрики одного процесса.
+
+    Каждый воркер gunicorn пишет свои значения в отдельный файл
+    в METRICS_DIR, а collect() складывает файлы живых воркеров.
+    Файлы завершившихся процессов collect() удаляет: после перезапуска
+    воркера его счётчики пропадают из суммы, и Prometheus видит это
+    как обычный сброс счётчика.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.path = Path(METRICS_DIR) / f'{self.pid}-{uuid.uuid4().hex}.json'
+        self.counters = {}
+        self.histograms = {}
+        self.flushed = time.monotonic()
+
+    def check_fork(self):
+        if os.getpid() != self.pid:
+            self.reset()
+
+    def inc(self, name, labels, value=1):
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        key = (name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = {
+                'buckets': [0] * (len(HISTOGRAMS[name][1]) + 1),
+                'sum': 0,
+                'count': 0,
+            }
+        histogram['buckets'][bisect_left(HISTOGRAMS[name][1], value)] += 1
+        histogram['sum'] += value
+        histogram['count'] += 1
+
+    def record_request(self, view, status, duration, size):
+        with self.lock:
+            self.check_fork()
+            self.inc(REQUESTS, (('view', view), ('status', str(status))))
+            self.observe(LATENCY, (('view', view),), duration)
+            if size is not None:
+                self.observe(SIZE, (('view', view),), size)
+            if time.monotonic() - self.flushed >= METRICS_FLUSH_INTERVAL:
+                self.flush()
+
+    def flush(self):
+        self.check_fork()
+        data = {
+            'counters': [
+                [name, labels, value]
+                for (name, labels), value in self.counters.items()
+            ],
+            'histograms': [
+                [name, labels, histogram]
+                for (name, labels), histogram in self.histograms.items()
+            ],
+        }
+        temporary = self.path.with_suffix('.tmp')
+        try:
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            temporary.write_text(json.dumps(data), encoding='utf-8')
+            os.replace(temporary, self.path)
+        except OSError as error:
+            logger.warning('Не удалось сохранить метрики: %s', error)
+        self.flushed = time.monotonic()
+
+    def collect(self):
+        with self.lock:
+            self.flush()
+        counters, histograms = {}, {}
+        for path in self.live_files():
+            try:
+                data = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in data['counters']:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, histogram in data['histograms']:
+                key = (name, tuple(map(tuple, labels)))
+                total = histograms.setdefault(key, {
+                    'buckets': [0] * len(histogram['buckets']),
+                    'sum': 0,
+                    'count': 0,
+                })
+                total['buckets'] = [
+                    a + b for a, b in zip(total['buckets'],
+                                          histogram['buckets'])
+                ]
+                total['sum'] += histogram['sum']
+                total['count'] += histogram['count']
+        return counters, histograms
+
+    def live_files(self):
+        for path in Path(METRICS_DIR).glob('*-*.*'):
+            pid = file_pid(path)
+            if pid is None:
+                continue
+            if pid != self.pid and not process_alive(pid):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            elif path.suffix == '.json':
+                yield path
+
+
+def format_labels(labels):
+    return '{' + ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\').replace(
+            '"', r'\"'
+        ).replace('\n', r'\n'))
+        for name, value in labels
+    ) + '}'
+
+
+def format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_metrics(counters, histograms):
+    lines = []
+    for name, help_text in COUNTERS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f'{name}{format_labels(labels)} {value}')
+    for name, (help_text, bounds) in HISTOGRAMS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for (metric, labels), histogram in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(
+                [*map(format_number, bounds), '+Inf'], histogram['buckets']
+            ):
+                cumulative += count
+                lines.append(
+                    f'{name}_bucket{format_labels((*labels, ("le", bound)))} '
+                    f'{cumulative}'
+                )
+            lines.append(
+                f'{name}_sum{format_labels(labels)} '
+                f'{format_number(histogram["sum"])}'
+            )
+            lines.append(
+                f'{name}_count{format_labels(labels)} {histogram["count"]}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+atexit.register(registry.flush)
@@ -0,0 +1,141 @@
+import logging
+import os
+import time
+import traceback
+from collections import Counter
+from contextlib import ExitStack
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from foodgram.metrics import registry
+from foodgram.settings import (BASE_DIR, METRICS, SQL_TIMING,
+                               SQL_TIMING_REPEAT_LIMIT)
+
+logger = logging.getLogger('foodgram.sql')
+
+
+ENTRY_POINTS = ('manage.py', os.path.join('foodgram', 'wsgi.py'))
+DJANGO_DB = os.path.join('django', 'db', '')
+
+
+def query_location():
+    stack = [
+        frame for frame in reversed(traceback.extract_stack())
+        if frame.filename != __file__
+    ]
+    for frame in stack:
+        if frame.filename.startswith(str(BASE_DIR)):
+            path = os.path.relpath(frame.filename, BASE_DIR)
+            if path not in ENTRY_POINTS:
+                return f'{path}:{frame.lineno} {frame.name}'
+    for frame in stack:
+        if DJANGO_DB not in frame.filename:
+            path = os.path.join(*frame.filename.split(os.sep)[-2:])
+            return f'{path}:{frame.lineno} {frame.name}'
+    return 'unknown'
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self.shapes = Counter()
+        self.locations = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql, repr(params)] += 1
+            self.shapes[sql] += 1
+            if self.shapes[sql] == SQL_TIMING_REPEAT_LIMIT:
+                self.locations[sql] = query_location()
+
+    @property
+    def duplicates(self):
+        return sum(count - 1 for count in self.statements.values())
+
+    def repeated(self):
+        return [
+            (sql, count, self.locations[sql])
+            for sql, count in self.shapes.items()
+            if count >= SQL_TIMING_REPEAT_LIMIT
+        ]
+
+
+class SQLTimingMiddleware:
+    def __init__(self, get_response):
+        if not SQL_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        total = (time.perf_counter() - started) * 1000
+        db_time = stats.duration * 1000
+        response['Server-Timing'] = (
+            f'db;desc="SQL x{stats.count}";dur={db_time:.1f}, '
+            f'app;dur={total - db_time:.1f}'
+        )
+        match = request.resolver_match
+        view = match.view_name if match else None
+        logger.info(
+            'method=%s path=%s view=%s status=%s queries=%d duplicates=%d '
+            'db_ms=%.1f total_ms=%.1f',
+            request.method, request.path, view, response.status_code,
+            stats.count, stats.duplicates, db_time, total,
+        )
+        for sql, count, location in stats.repeated():
+            logger.warning(
+                'repeated_query view=%s count=%d location=%s sql=%s',
+                view, count, location, sql[:300],
+            )
+        return response
+
+
+def view_label(request):
+    match = request.resolver_match
+    if match is None:
+        return 'unmatched'
+    view_class = getattr(match.func, 'cls', None)
+    if view_class is None:
+        return match.view_name or match._func_path
+    name = view_class.__name__
+    if not view_class.__module__.startswith('api.'):
+        name = f'{view_class.__module__}.{name}'
+    method = request.method.lower()
+    actions = getattr(match.func, 'actions', None) or {}
+    return f'{name}.{actions.get(method, method)}'
+
+
+def response_size(response):
+    if not response.streaming:
+        return len(response.content)
+    length = response.get('Content-Length')
+    return int(length) if length else None
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        if not METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        registry.record_request(
+            view_label(request), response.status_code,
+            time.perf_counter() - started, response_size(response),
+        )
+        return response
@@ -36,9 +36,12 @@ INSTALLED_APPS = [
 
     'user.apps.UserConfig',
     'api.apps.ApiConfig',
+    'jobs.apps.JobsConfig',
 ]
 
 MIDDLEWARE = [
+    'foodgram.middleware.MetricsMiddleware',
+    'foodgram.middleware.SQLTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -81,6 +84,17 @@ DATABASES = {
 }
 
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', '/var/tmp/foodgram_cache'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+
 AUTH_USER_MODEL = 'user.FoodgramUser'
 
 
@@ -153,6 +167,10 @@ STATIC_ROOT = BASE_DIR / 'collected_static'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / MEDIA_URL
 
+RECIPE_IMAGE_MAX_SIZE = 5 * 1024 * 1024
+
+DATA_UPLOAD_MAX_MEMORY_SIZE = RECIPE_IMAGE_MAX_SIZE * 4 // 3 + 1024 * 1024
+
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -172,3 +190,105 @@ HEX_LEN = 7
 HEX_DEFAULT_COLOR = '#0000FF'
 
 RECIPE_ON_PAGE = 6
+
+RECIPE_MAX_ON_PAGE = 100
+
+RECIPES_LIMIT = 3
+
+BATCH_MAX_SIZE = 100
+
+SHOPPING_LIST_CACHE_TIMEOUT = 60 * 60 * 24
+
+SHOPPING_LIST_FONT = os.getenv(
+    'SHOPPING_LIST_FONT', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+)
+
+INGREDIENT_INDEX_MAX_AGE = 60 * 60
+
+INGREDIENT_SEARCH_POPULARITY = True
+
+REFERENCE_CACHE_MAX_AGE = 60 * 60 * 24
+
+RECIPE_COUNT_CACHE_TIMEOUT = 60
+
+INGREDIENT_LOAD_BATCH_SIZE = 1000
+
+BENCHMARK_BASELINE = BASE_DIR / 'api' / 'benchmark_baseline.json'
+
+SQL_TIMING = config('SQL_TIMING', default=False, cast=bool)
+
+SQL_TIMING_REPEAT_LIMIT = 5
+
+RECIPE_IMAGE_MAX_PIXELS = 40_000_000
+
+RECIPE_IMAGE_VARIANTS = {
+    'full': (1280, 1280),
+    'card': (480, 480),
+    'thumbnail': (160, 160),
+}
+
+RECIPE_IMAGE_QUALITY = 80
+
+MEDIA_GC_DELAY = 60
+
+MEDIA_GC_GRACE = 60 * 60
+
+MEDIA_GC_BATCH_SIZE = 1000
+
+JOBS_EAGER = config('JOBS_EAGER', default=False, cast=bool)
+
+JOB_MAX_LEN = 200
+
+JOB_MAX_ATTEMPTS = 5
+
+JOB_RETRY_BACKOFF = 10
+
+JOB_RETRY_BACKOFF_MAX = 60 * 60
+
+JOB_LOCK_TIMEOUT = 15 * 60
+
+JOB_WORKER_THREADS = 4
+
+JOB_POLL_INTERVAL = 1
+
+JOB_KEEP_FINISHED = 60 * 60 * 24 * 7
+
+EMAIL_BACKEND = 'jobs.mail.QueuedEmailBackend'
+
+JOBS_EMAIL_BACKEND = config(
+    'EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend'
+)
+
+METRICS = config('METRICS', default=True, cast=bool)
+
+METRICS_DIR = os.getenv('METRICS_DIR', '/var/tmp/foodgram_metrics')
+
+METRICS_FLUSH_INTERVAL = 5
+
+METRICS_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+
+METRICS_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'foodgram.sql': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'foodgram.jobs': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
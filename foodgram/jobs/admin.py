@@ -0,0 +1,36 @@
+from django.contrib import admin
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id', 'task', 'status', 'attempts', 'run_at', 'created_at',
+        'finished_at',
+    )
+    list_filter = ('status',)
+    search_fields = ('task', 'key')
+    readonly_fields = ('locked_at', 'locked_by', 'last_error', 'created_at',
+                       'finished_at')
+    show_full_result_count = False
+    actions = ('requeue',)
+
+    @admin.action(description='Поставить в очередь заново')
+    def requeue(self, request, queryset):
+        requeued = 0
+        for job in queryset.exclude(status__in=(Job.QUEUED, Job.RUNNING)):
+            try:
+                with transaction.atomic():
+                    Job.objects.filter(pk=job.pk).update(
+                        status=Job.QUEUED, attempts=0, run_at=timezone.now(),
+                        finished_at=None,
+                    )
+            except IntegrityError:
+                continue
+            requeued += 1
+        self.message_user(request, f'Поставлено в очередь: {requeued}')
+
+
+admin.site.register(Job, JobAdmin)
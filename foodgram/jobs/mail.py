@@ -0,0 +1,48 @@
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from jobs.queue import enqueue
+from jobs.tasks import send_email
+
+from foodgram.settings import JOBS_EMAIL_BACKEND
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Кладёт письма в очередь задач, а отправляет их обработчик
+    через JOBS_EMAIL_BACKEND. Письма с вложениями уходят сразу.
+
+    fail_silently относится к постановке в очередь и к письмам,
+    отправленным сразу; ошибки отправки в обработчике он не скрывает.
+    """
+
+    def send_messages(self, email_messages):
+        inline, sent = [], 0
+        for message in email_messages:
+            if message.attachments:
+                inline.append(message)
+                continue
+            try:
+                self.enqueue(message)
+            except Exception:
+                if not self.fail_silently:
+                    raise
+            else:
+                sent += 1
+        if inline:
+            sent += get_connection(
+                JOBS_EMAIL_BACKEND, fail_silently=self.fail_silently
+            ).send_messages(inline) or 0
+        return sent
+
+    def enqueue(self, message):
+        enqueue(send_email, kwargs={'message': {
+            'subject': message.subject,
+            'body': message.body,
+            'from_email': message.from_email,
+            'to': message.to,
+            'cc': message.cc,
+            'bcc': message.bcc,
+            'reply_to': message.reply_to,
+            'headers': message.extra_headers,
+            'alternatives': getattr(message, 'alternatives', []),
+        }})
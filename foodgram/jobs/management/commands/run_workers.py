@@ -0,0 +1,68 @@
+import os
+import signal
+import socket
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+
+from jobs.queue import claim_jobs, requeue_stale, run_job, schedule_periodic
+
+from foodgram.settings import (JOB_LOCK_TIMEOUT, JOB_POLL_INTERVAL,
+                               JOB_WORKER_THREADS)
+
+
+class Command(BaseCommand):
+    help = ('Выполняет фоновые задачи из очереди в пуле потоков '
+            'и запускает периодические задачи')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=JOB_WORKER_THREADS,
+            help='число потоков-обработчиков'
+        )
+        parser.add_argument(
+            '--poll', type=float, default=JOB_POLL_INTERVAL,
+            help='пауза в секундах, когда очередь пуста'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='выполнить готовые задачи и выйти'
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        worker = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        threads = options['threads']
+        schedule_periodic()
+        checked = 0
+        processed = 0
+        running = set()
+        with ThreadPoolExecutor(threads) as pool:
+            while not self.stopping:
+                if time.monotonic() - checked > JOB_LOCK_TIMEOUT / 10:
+                    requeue_stale()
+                    checked = time.monotonic()
+                jobs = claim_jobs(threads - len(running), worker)
+                running.update(pool.submit(run_job, job) for job in jobs)
+                processed += len(jobs)
+                if not running:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll'])
+                    continue
+                done, running = wait(
+                    running,
+                    timeout=None if len(running) == threads
+                    else options['poll'],
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    future.result()
+        self.stdout.write(f'Выполнено задач: {processed}')
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,99 @@
+from django.db import models
+from django.utils import timezone
+
+from foodgram.settings import JOB_MAX_ATTEMPTS, JOB_MAX_LEN
+
+
+class Job(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    task = models.CharField(
+        verbose_name='Задача',
+        max_length=JOB_MAX_LEN,
+    )
+    args = models.JSONField(
+        verbose_name='Позиционные аргументы',
+        default=list,
+    )
+    kwargs = models.JSONField(
+        verbose_name='Именованные аргументы',
+        default=dict,
+    )
+    key = models.CharField(
+        verbose_name='Ключ',
+        max_length=JOB_MAX_LEN,
+        null=True,
+        blank=True,
+        help_text='В очереди может быть только одна задача с этим ключом',
+    )
+    status = models.CharField(
+        verbose_name='Состояние',
+        max_length=max(len(status) for status, _ in STATUSES),
+        choices=STATUSES,
+        default=QUEUED,
+    )
+    attempts = models.PositiveIntegerField(
+        verbose_name='Попыток',
+        default=0,
+    )
+    max_attempts = models.PositiveIntegerField(
+        verbose_name='Максимум попыток',
+        default=JOB_MAX_ATTEMPTS,
+    )
+    run_at = models.DateTimeField(
+        verbose_name='Запустить не раньше',
+        default=timezone.now,
+    )
+    locked_at = models.DateTimeField(
+        verbose_name='Взята в работу',
+        null=True,
+        blank=True,
+    )
+    locked_by = models.CharField(
+        verbose_name='Обработчик',
+        max_length=JOB_MAX_LEN,
+        blank=True,
+    )
+    last_error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True,
+    )
+    created_at = models.DateTimeField(
+        verbose_name='Создана',
+        auto_now_add=True,
+    )
+    finished_at = models.DateTimeField(
+        verbose_name='Завершена',
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        ordering = ('-created_at',)
+        indexes = [
+            models.Index(
+                fields=('status', 'run_at'),
+                name='job_status_run_at_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=('key',),
+                condition=models.Q(status='queued'),
+                name='unique_queued_job_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.task} #{self.pk}: {self.get_status_display()}'
@@ -0,0 +1,180 @@
+import datetime
+import logging
+import random
+import traceback
+
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F, Subquery
+from django.utils import timezone
+
+from jobs.models import Job
+
+from foodgram.settings import (JOB_LOCK_TIMEOUT, JOB_MAX_ATTEMPTS,
+                               JOB_RETRY_BACKOFF, JOB_RETRY_BACKOFF_MAX,
+                               JOBS_EAGER)
+
+logger = logging.getLogger('foodgram.jobs')
+
+TASKS = {}
+
+
+def task(max_attempts=JOB_MAX_ATTEMPTS, every=None):
+    """Регистрирует функцию как фоновую задачу.
+
+    every — период в секундах для задач, которые обработчики
+    запускают сами по расписанию.
+    """
+    def register(func):
+        func.task_name = f'{func.__module__}.{func.__name__}'
+        func.max_attempts = max_attempts
+        func.every = every
+        TASKS[func.task_name] = func
+        return func
+    return register
+
+
+def get_task(name):
+    try:
+        return TASKS[name]
+    except KeyError:
+        raise LookupError(f'Неизвестная задача {name}')
+
+
+def enqueue(func, args=(), kwargs=None, delay=0, key=None):
+    """Ставит задачу в очередь в текущей транзакции.
+
+    Обработчики увидят её только после коммита. Если задача с тем же
+    key уже ждёт в очереди, новая не создаётся.
+    """
+    name = func if isinstance(func, str) else func.task_name
+    func, kwargs = get_task(name), kwargs or {}
+    if JOBS_EAGER:
+        transaction.on_commit(lambda: func(*args, **kwargs))
+        return None
+    try:
+        with transaction.atomic():
+            return Job.objects.create(
+                task=name,
+                args=list(args),
+                kwargs=kwargs,
+                key=key,
+                max_attempts=func.max_attempts,
+                run_at=timezone.now() + datetime.timedelta(seconds=delay),
+            )
+    except IntegrityError:
+        if key is None:
+            raise
+        return Job.objects.filter(key=key, status=Job.QUEUED).first()
+
+
+def periodic_key(name):
+    return f'periodic:{name}'
+
+
+def schedule_periodic():
+    for name, func in TASKS.items():
+        if func.every and not Job.objects.filter(
+            key=periodic_key(name), status__in=(Job.QUEUED, Job.RUNNING)
+        ).exists():
+            enqueue(name, key=periodic_key(name))
+
+
+def claim_jobs(limit, worker):
+    """Забирает до limit готовых задач одним UPDATE.
+
+    На Postgres подзапрос блокирует строки через FOR UPDATE SKIP LOCKED,
+    и обработчики не ждут друг друга. SQLite такой блокировки не знает,
+    но сразу берёт блокировку на запись, а условие status=queued не даёт
+    взять одну задачу дважды.
+    """
+    if limit < 1:
+        return []
+    now = timezone.now()
+    with transaction.atomic():
+        ready = Job.objects.select_for_update(skip_locked=True).filter(
+            status=Job.QUEUED, run_at__lte=now
+        ).order_by('run_at').values('pk')[:limit]
+        if not Job.objects.filter(
+            pk__in=Subquery(ready), status=Job.QUEUED
+        ).update(
+            status=Job.RUNNING,
+            locked_at=now,
+            locked_by=worker,
+            attempts=F('attempts') + 1,
+        ):
+            return []
+        return list(Job.objects.filter(
+            status=Job.RUNNING, locked_by=worker, locked_at=now
+        ))
+
+
+def retry_delay(attempts):
+    delay = min(JOB_RETRY_BACKOFF * 2 ** (attempts - 1), JOB_RETRY_BACKOFF_MAX)
+    return datetime.timedelta(seconds=delay * random.uniform(1, 1.25))
+
+
+def finish_job(job, error=None):
+    now = timezone.now()
+    if error is None:
+        job.status = Job.DONE
+    elif job.attempts < job.max_attempts:
+        job.status = Job.QUEUED
+        job.run_at = now + retry_delay(job.attempts)
+    else:
+        job.status = Job.FAILED
+    job.last_error = error or ''
+    job.locked_at = None
+    job.locked_by = ''
+    job.finished_at = now if job.status != Job.QUEUED else None
+    fields = (
+        'status', 'run_at', 'last_error', 'locked_at', 'locked_by',
+        'finished_at',
+    )
+    try:
+        with transaction.atomic():
+            job.save(update_fields=fields)
+    except IntegrityError:
+        # Пока задача выполнялась, в очередь встала другая с тем же key:
+        # повтор не нужен, её выполнит та задача.
+        job.status, job.finished_at = Job.FAILED, now
+        job.save(update_fields=fields)
+    func = TASKS.get(job.task)
+    if job.status != Job.QUEUED and func is not None and func.every:
+        enqueue(func, delay=func.every, key=periodic_key(job.task))
+
+
+def run_job(job):
+    started = timezone.now()
+    error = None
+    try:
+        func = get_task(job.task)
+        with transaction.atomic():
+            func(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning(
+            'Задача %s #%s, попытка %s: ошибка\n%s',
+            job.task, job.pk, job.attempts, error,
+        )
+        close_old_connections()
+    finish_job(job, error)
+    logger.info(
+        'job=%s id=%s status=%s attempts=%s duration_ms=%.1f',
+        job.task, job.pk, job.status, job.attempts,
+        (timezone.now() - started).total_seconds() * 1000,
+    )
+    return job
+
+
+def requeue_stale():
+    """Возвращает в очередь задачи обработчиков, которые упали,
+    не успев отметить результат."""
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        locked_at__lt=timezone.now() - datetime.timedelta(
+            seconds=JOB_LOCK_TIMEOUT
+        ),
+    )
+    for job in stale:
+        finish_job(job, 'Обработчик не завершил задачу вовремя')
+    return len(stale)
@@ -0,0 +1,28 @@
+import datetime
+
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import task
+
+from foodgram.settings import JOB_KEEP_FINISHED, JOBS_EMAIL_BACKEND
+
+
+@task()
+def send_email(message):
+    email = EmailMultiAlternatives(
+        connection=get_connection(JOBS_EMAIL_BACKEND), **message
+    )
+    email.alternatives = [tuple(item) for item in email.alternatives]
+    email.send()
+
+
+@task(every=60 * 60 * 24)
+def prune_jobs():
+    Job.objects.filter(
+        status__in=(Job.DONE, Job.FAILED),
+        finished_at__lt=timezone.now() - datetime.timedelta(
+            seconds=JOB_KEEP_FINISHED
+        ),
+    ).delete()
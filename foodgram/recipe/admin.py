@@ -2,6 +2,7 @@ from django.contrib import admin
 from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 
+from .ingredient_loader import load_ingredients, read_dataset
 from .models import Cart, Favorites, Ingredient, IngredientAmount, Recipe, Tag
 
 
@@ -10,10 +11,26 @@ class IngridientResource(resources.ModelResource):
     class Meta:
         model = Ingredient
 
+    def import_data(self, dataset, dry_run=False, **kwargs):
+        stats = load_ingredients(read_dataset(dataset), dry_run=dry_run)
+        result = self.get_result_class()()
+        result.diff_headers = ['name', 'measurement_unit']
+        result.totals.update(
+            new=stats['inserted'],
+            skip=stats['skipped'],
+            invalid=stats['invalid'],
+        )
+        result.total_rows = sum(stats.values())
+        return result
+
 
 class IngredientInline(admin.TabularInline):
     model = IngredientAmount
     extra = 1
+    autocomplete_fields = ('ingredients',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('ingredients')
 
 
 class IngredientAdmin(ImportExportModelAdmin):
@@ -24,7 +41,7 @@ class IngredientAdmin(ImportExportModelAdmin):
         'measurement_unit'
     )
     search_fields = ('name',)
-    list_filter = ('name',)
+    list_filter = ('measurement_unit',)
 
 
 class RecipeAdmin(admin.ModelAdmin):
@@ -37,16 +54,40 @@ class RecipeAdmin(admin.ModelAdmin):
         'is_favorited',
     )
     search_fields = ('author__username', 'name',)
-    list_filter = ('author', 'name', 'tags')
+    list_filter = ('tags',)
+    list_select_related = ('author',)
+    autocomplete_fields = ('author',)
+    show_full_result_count = False
     inlines = (IngredientInline,)
 
+    @admin.display(description='В избранном', ordering='favorites_count')
     def is_favorited(self, obj):
-        return obj.favorite_recipe.count()
+        return obj.favorites_count
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        Recipe.recipes.filter(pk=form.instance.pk).touch()
+
+
+class IngredientAmountAdmin(admin.ModelAdmin):
+    list_display = ('id', 'recipe', 'ingredients', 'amount')
+    list_select_related = ('recipe__author', 'ingredients')
+    autocomplete_fields = ('recipe', 'ingredients')
+    search_fields = ('recipe__name', 'ingredients__name')
+    show_full_result_count = False
+
+
+class UserRecipeAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'recipe', 'created_at')
+    list_select_related = ('user', 'recipe__author')
+    autocomplete_fields = ('user', 'recipe')
+    search_fields = ('user__username', 'recipe__name')
+    show_full_result_count = False
 
 
 admin.site.register(Recipe, RecipeAdmin)
 admin.site.register(Ingredient, IngredientAdmin)
-admin.site.register(IngredientAmount)
+admin.site.register(IngredientAmount, IngredientAmountAdmin)
 admin.site.register(Tag)
-admin.site.register(Cart)
-admin.site.register(Favorites)
+admin.site.register(Cart, UserRecipeAdmin)
+admin.site.register(Favorites, UserRecipeAdmin)
@@ -0,0 +1,115 @@
+from functools import partial
+
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+
+from recipe.counters import COUNTERS, actual_count
+from recipe.models import Cart, Favorites, Recipe, User
+from recipe.shopping_list import reset_cart_version
+from user.models import Follow
+
+RELATIONS = {
+    Cart: ('recipe', Recipe),
+    Favorites: ('recipe', Recipe),
+    Follow: ('following', User),
+}
+
+CREATED = 'created'
+EXISTS = 'exists'
+DELETED = 'deleted'
+MISSING = 'missing'
+NOT_FOUND = 'not_found'
+FORBIDDEN = 'forbidden'
+
+
+def lock_targets(model, ids):
+    """Блокирует строки объектов до конца транзакции: параллельные
+    запросы не добавят к ним связи и не изменят их счётчики до коммита,
+    поэтому пересчёт в recount() не затирает чужие F()-изменения."""
+    _, target = RELATIONS[model]
+    list(target._default_manager.filter(
+        pk__in=ids
+    ).select_for_update().order_by('pk').values_list('pk'))
+
+
+def find_targets(model, user, ids):
+    """Одним запросом: какие из ids существуют и какие уже связаны
+    с пользователем."""
+    field, target = RELATIONS[model]
+    return dict(target._default_manager.filter(pk__in=ids).annotate(
+        linked=Exists(model.objects.filter(
+            user=user, **{field: OuterRef('pk')}
+        ))
+    ).order_by().values_list('pk', 'linked'))
+
+
+def recount(model, ids):
+    """Одним UPDATE на счётчик. Вызывать под lock_targets()."""
+    for target, counter, source, field in COUNTERS:
+        if source is model:
+            target._default_manager.filter(pk__in=ids).update(
+                **{counter: actual_count(source, field)}
+            )
+
+
+@transaction.atomic
+def add_relations(model, user, ids, forbidden=()):
+    field, _ = RELATIONS[model]
+    lock_targets(model, ids)
+    targets = find_targets(model, user, ids)
+    results = {}
+    for pk in ids:
+        if pk not in targets:
+            results[pk] = NOT_FOUND
+        elif pk in forbidden:
+            results[pk] = FORBIDDEN
+        else:
+            results[pk] = EXISTS if targets[pk] else CREATED
+    created = [pk for pk, result in results.items() if result == CREATED]
+    if created:
+        model.objects.bulk_create(
+            (model(user=user, **{f'{field}_id': pk}) for pk in created),
+            ignore_conflicts=True,
+        )
+        changed(model, user, created)
+    return results
+
+
+@transaction.atomic
+def remove_relations(model, user, ids):
+    lock_targets(model, ids)
+    targets = find_targets(model, user, ids)
+    results = {
+        pk: NOT_FOUND if pk not in targets
+        else DELETED if targets[pk] else MISSING
+        for pk in ids
+    }
+    deleted = [pk for pk, result in results.items() if result == DELETED]
+    if deleted:
+        delete_rows(model, user, deleted)
+        changed(model, user, deleted)
+    return results
+
+
+def delete_rows(model, user, ids):
+    """Удаляет связи одним DELETE: QuerySet.delete() при подписанных
+    сигналах удаляет по строке и по строке обновляет счётчики."""
+    field, _ = RELATIONS[model]
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(model._meta.db_table)} '
+            f'WHERE {quote(model._meta.get_field("user").column)} = %s '
+            f'AND {quote(model._meta.get_field(field).column)} '
+            f'IN ({placeholders})',
+            [user.id, *ids],
+        )
+
+
+def changed(model, user, ids):
+    """bulk_create и delete_rows() не отправляют сигналы, поэтому счётчики
+    пересчитываются здесь, а версия корзины сбрасывается после коммита."""
+    recount(model, ids)
+    if model is Cart:
+        transaction.on_commit(partial(reset_cart_version, user.id))
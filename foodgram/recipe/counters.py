@@ -0,0 +1,51 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from recipe.models import Cart, Favorites, Recipe, User
+from user.models import Follow
+
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorites, 'recipe'),
+    (Recipe, 'in_cart_count', Cart, 'recipe'),
+    (User, 'recipes_count', Recipe, 'author'),
+    (User, 'followers_count', Follow, 'following'),
+)
+
+
+def change_counter(model, counter, pk, delta):
+    if pk is None:
+        return
+    queryset = model._default_manager.filter(pk=pk)
+    if delta < 0:
+        queryset = queryset.filter(**{f'{counter}__gte': -delta})
+    queryset.update(**{counter: F(counter) + delta})
+
+
+def change_counters(instance, delta):
+    for model, counter, source, field in COUNTERS:
+        if isinstance(instance, source):
+            change_counter(
+                model, counter, getattr(instance, f'{field}_id'), delta
+            )
+
+
+def actual_count(source, field):
+    return Coalesce(Subquery(
+        source._default_manager.filter(
+            **{field: OuterRef('pk')}
+        ).order_by().values(field).annotate(
+            total=Count('pk')
+        ).values('total')
+    ), 0)
+
+
+def repair_counters(dry_run=False):
+    for model, counter, source, field in COUNTERS:
+        drifted = model._default_manager.annotate(
+            actual=actual_count(source, field)
+        ).exclude(**{counter: F('actual')})
+        if dry_run:
+            repaired = drifted.count()
+        else:
+            repaired = drifted.update(**{counter: F('actual')})
+        yield model, counter, repaired
@@ -0,0 +1,269 @@
+import binascii
+import datetime
+import io
+import logging
+import os
+import posixpath
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from recipe.models import Recipe
+from recipe.storage import recipe_image_storage
+
+from foodgram.settings import (MEDIA_GC_BATCH_SIZE, MEDIA_GC_GRACE,
+                               RECIPE_IMAGE_MAX_PIXELS, RECIPE_IMAGE_MAX_SIZE,
+                               RECIPE_IMAGE_QUALITY, RECIPE_IMAGE_VARIANTS)
+
+BASE64_CHUNK_SIZE = 64 * 1024
+VARIANT_FORMAT = 'WEBP' if features.check('webp') else 'JPEG'
+VARIANT_EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+IMAGES_DIR = 'recipe_images'
+VARIANTS_DIR = f'{IMAGES_DIR}/variants'
+
+logger = logging.getLogger('foodgram.images')
+
+
+def base64_length(size):
+    return (size + 2) // 3 * 4
+
+
+def base64_chunks(encoded):
+    """Режет base64 на куски длиной кратной 4 без пробелов и переводов
+    строк, чтобы каждый кусок декодировался отдельно."""
+    carry = ''
+    for start in range(0, len(encoded), BASE64_CHUNK_SIZE):
+        chunk = carry + ''.join(
+            encoded[start:start + BASE64_CHUNK_SIZE].split()
+        )
+        end = len(chunk) - len(chunk) % 4
+        carry = chunk[end:]
+        yield chunk[:end]
+    if carry:
+        yield carry
+
+
+def decode_base64_image(data, max_size=RECIPE_IMAGE_MAX_SIZE):
+    header, _, encoded = data.partition(';base64,')
+    if not encoded:
+        raise ValidationError('Изображение должно быть в формате base64.')
+    too_big = ValidationError(
+        f'Изображение больше {max_size // 1024 // 1024} МБ.'
+    )
+    # Длину с запасом на переводы строк проверяем до декодирования,
+    # точный размер - по декодированным байтам.
+    if len(encoded) > 2 * base64_length(max_size):
+        raise too_big
+    ext = header.split('/')[-1]
+    file = TemporaryUploadedFile(f'temp.{ext}', f'image/{ext}', 0, None)
+    try:
+        for chunk in base64_chunks(encoded):
+            file.write(binascii.a2b_base64(chunk))
+            if file.tell() > max_size:
+                file.close()
+                raise too_big
+    except (binascii.Error, ValueError):
+        file.close()
+        raise ValidationError('Некорректное изображение в base64.')
+    file.size = file.tell()
+    file.seek(0)
+    return file
+
+
+def check_image_pixels(file):
+    image = getattr(file, 'image', None)
+    if image is not None and (
+        image.width * image.height > RECIPE_IMAGE_MAX_PIXELS
+    ):
+        raise ValidationError('Слишком большое разрешение изображения.')
+    return file
+
+
+def prepare_image(image):
+    image = ImageOps.exif_transpose(image)
+    transparent = (
+        image.mode in ('RGBA', 'LA', 'PA')
+        or 'transparency' in image.info
+    )
+    if not transparent:
+        return image.convert('RGB')
+    image = image.convert('RGBA')
+    if VARIANT_FORMAT == 'WEBP':
+        return image
+    background = Image.new('RGB', image.size, 'white')
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def image_stem(name):
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+def variant_name(name, variant):
+    """Имя зависит от оригинала и параметров копии, поэтому копии
+    одинаковых изображений общие, а смена размеров даёт новые имена."""
+    width, height = RECIPE_IMAGE_VARIANTS[variant]
+    ext = VARIANT_EXTENSIONS[VARIANT_FORMAT]
+    return (
+        f'{VARIANTS_DIR}/{image_stem(name)}_'
+        f'{width}x{height}q{RECIPE_IMAGE_QUALITY}.{ext}'
+    )
+
+
+def variant_names(name):
+    return {
+        variant: variant_name(name, variant)
+        for variant in RECIPE_IMAGE_VARIANTS
+    }
+
+
+def render_variants(file):
+    """Уменьшенные копии от большей к меньшей: каждая следующая
+    строится из предыдущей, а не из оригинала."""
+    file.seek(0)
+    with Image.open(file) as original:
+        original.draft('RGB', max(RECIPE_IMAGE_VARIANTS.values()))
+        image = prepare_image(original)
+    for variant, size in sorted(
+        RECIPE_IMAGE_VARIANTS.items(), key=lambda item: item[1],
+        reverse=True,
+    ):
+        image = image.copy()
+        image.thumbnail(size, Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, VARIANT_FORMAT, quality=RECIPE_IMAGE_QUALITY)
+        yield variant, buffer.getvalue()
+
+
+def save_variants(image_field, overwrite=False):
+    names = variant_names(image_field.name)
+    if overwrite:
+        delete_variants(names.values())
+    elif all(default_storage.exists(name) for name in names.values()):
+        return names
+    variants = {}
+    try:
+        with image_field.storage.open(image_field.name, 'rb') as file:
+            for variant, content in render_variants(file):
+                name = names[variant]
+                if not default_storage.exists(name):
+                    name = default_storage.save(name, ContentFile(content))
+                variants[variant] = name
+    except OSError as error:
+        logger.warning(
+            'Не удалось построить копии %s: %s', image_field.name, error
+        )
+        return {}
+    return variants
+
+
+def delete_variants(names):
+    for name in names:
+        default_storage.delete(name)
+
+
+def is_fresh(storage, name):
+    try:
+        modified = storage.get_modified_time(name)
+    except OSError:
+        return False
+    return modified > timezone.now() - datetime.timedelta(
+        seconds=MEDIA_GC_GRACE
+    )
+
+
+def release_image(name, variants=()):
+    """Удаляет изображение и его копии, если на него больше не ссылается
+    ни один рецепт. Недавно записанные файлы не трогает: их может
+    использовать рецепт, который ещё не сохранён."""
+    if not name or Recipe.recipes.filter(image=name).exists():
+        return False
+    if is_fresh(recipe_image_storage, name):
+        return False
+    recipe_image_storage.delete(name)
+    delete_variants({*variants, *variant_names(name).values()})
+    return True
+
+
+def walk(storage, path):
+    try:
+        directories, files = storage.listdir(path)
+    except FileNotFoundError:
+        return
+    for file in files:
+        yield posixpath.join(path, file)
+    for directory in directories:
+        yield from walk(storage, posixpath.join(path, directory))
+
+
+def batches(names):
+    names = iter(names)
+    while True:
+        batch = list(islice(names, MEDIA_GC_BATCH_SIZE))
+        if not batch:
+            return
+        yield batch
+
+
+def variants_in_use(names):
+    query = Q()
+    for variant in RECIPE_IMAGE_VARIANTS:
+        query |= Q(**{f'image_variants__{variant}__in': names})
+    return {
+        name
+        for variants in Recipe.recipes.filter(query).values_list(
+            'image_variants', flat=True
+        )
+        for name in variants.values()
+    }
+
+
+def collect_orphans(dry_run=False):
+    """Ищет файлы изображений, на которые не ссылается ни один рецепт,
+    и удаляет их, если они старше MEDIA_GC_GRACE."""
+    orphans, expected = [], set()
+    originals = (
+        name for name in walk(recipe_image_storage, IMAGES_DIR)
+        if not name.startswith(f'{VARIANTS_DIR}/')
+    )
+    for batch in batches(originals):
+        referenced = set(Recipe.recipes.filter(
+            image__in=batch
+        ).values_list('image', flat=True))
+        for name in batch:
+            if name in referenced:
+                expected.update(variant_names(name).values())
+            elif not is_fresh(recipe_image_storage, name):
+                orphans.append((recipe_image_storage, name))
+    # Копии со старыми именами или размерами удаляются, только если
+    # на них не ссылается image_variants ни одного рецепта.
+    unexpected = (
+        name for name in walk(default_storage, VARIANTS_DIR)
+        if name not in expected and not is_fresh(default_storage, name)
+    )
+    for batch in batches(unexpected):
+        in_use = variants_in_use(batch)
+        orphans.extend(
+            (default_storage, name) for name in batch if name not in in_use
+        )
+    if not dry_run:
+        for storage, name in orphans:
+            storage.delete(name)
+    return [name for _, name in orphans]
+
+
+def variant_urls(recipe):
+    if not recipe.image:
+        return {}
+    variants = recipe.image_variants or {}
+    return {
+        variant: default_storage.url(variants[variant])
+        if variant in variants else recipe.image.url
+        for variant in RECIPE_IMAGE_VARIANTS
+    }
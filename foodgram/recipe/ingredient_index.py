@@ -0,0 +1,106 @@
+import bisect
+import re
+import threading
+import time
+
+from django.db.models import Count
+
+from recipe.models import Ingredient
+from recipe.versions import (INGREDIENTS_VERSION_KEY, get_version,
+                             reset_versions)
+
+from foodgram.settings import (INGREDIENT_INDEX_MAX_AGE,
+                               INGREDIENT_SEARCH_POPULARITY)
+
+WORD_START = re.compile(r'(?<=[\s\-,.(])\w')
+
+_index = None
+_lock = threading.Lock()
+
+
+class IngredientIndex:
+    def __init__(self, ingredients, version=None):
+        self.version = version
+        self.built_at = time.monotonic()
+        if INGREDIENT_SEARCH_POPULARITY:
+            ingredients = sorted(ingredients, key=lambda ing: (
+                -ing['popularity'], ing['name'].lower(), ing['id']
+            ))
+        else:
+            ingredients = sorted(ingredients, key=lambda ing: (
+                ing['name'].lower(), ing['id']
+            ))
+        self.items = [
+            {
+                'id': ing['id'],
+                'name': ing['name'],
+                'measurement_unit': ing['measurement_unit'],
+            } for ing in ingredients
+        ]
+        self.names = [ing['name'].lower() for ing in ingredients]
+        self.prefixes = sorted(
+            (name, rank) for rank, name in enumerate(self.names)
+        )
+        self.word_starts = sorted(
+            (name[match.start():], rank)
+            for rank, name in enumerate(self.names)
+            for match in WORD_START.finditer(name)
+        )
+
+    @classmethod
+    def build(cls, version=None):
+        return cls(
+            Ingredient.objects.values(
+                'id', 'name', 'measurement_unit'
+            ).annotate(popularity=Count('recipe')).order_by(),
+            version=version,
+        )
+
+    @staticmethod
+    def _starting_with(keys, query):
+        start = bisect.bisect_left(keys, (query,))
+        ranks = []
+        for key, rank in keys[start:]:
+            if not key.startswith(query):
+                break
+            ranks.append(rank)
+        return sorted(set(ranks))
+
+    def search(self, query, limit=None):
+        query = query.lower()
+        if not query:
+            return []
+        ranks = sorted(
+            self._starting_with(self.prefixes, query),
+            key=lambda rank: self.names[rank] != query
+        )
+        found = set(ranks)
+        if limit is None or len(ranks) < limit:
+            for rank in self._starting_with(self.word_starts, query):
+                if rank not in found:
+                    ranks.append(rank)
+                    found.add(rank)
+        if limit is None or len(ranks) < limit:
+            for rank, name in enumerate(self.names):
+                if rank not in found and query in name:
+                    ranks.append(rank)
+                    if limit is not None and len(ranks) >= limit:
+                        break
+        return [self.items[rank] for rank in ranks[:limit]]
+
+
+def get_ingredient_index():
+    global _index
+    version = get_version(INGREDIENTS_VERSION_KEY)
+    index = _index
+    if (index is None or index.version != version
+            or time.monotonic() - index.built_at > INGREDIENT_INDEX_MAX_AGE):
+        with _lock:
+            if _index is index:
+                _index = IngredientIndex.build(version)
+            index = _index
+    return index
+
+
+def reset_ingredient_index():
+    reset_versions(INGREDIENTS_VERSION_KEY)
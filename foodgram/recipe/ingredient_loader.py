@@ -0,0 +1,115 @@
+import csv
+import json
+import re
+from collections import Counter
+from functools import partial
+from itertools import islice
+
+from django.db import transaction
+
+from recipe.ingredient_index import reset_ingredient_index
+from recipe.models import Ingredient
+
+from foodgram.settings import INGREDIENT_LOAD_BATCH_SIZE, RECIPE_MODEL_MAX_LEN
+
+JSON_SEPARATORS = re.compile(r'[\s,]*')
+JSON_CHUNK_SIZE = 64 * 1024
+
+
+def read_csv(file):
+    for row in csv.reader(file):
+        if row:
+            yield dict(zip(('name', 'measurement_unit'), row))
+
+
+def read_json(file):
+    decoder = json.JSONDecoder()
+    buffer, position, started = '', 0, False
+    for chunk in iter(partial(file.read, JSON_CHUNK_SIZE), ''):
+        buffer = buffer[position:] + chunk
+        position = 0
+        if not started:
+            buffer = buffer.lstrip()
+            if not buffer:
+                continue
+            if buffer[0] != '[':
+                raise ValueError('Ожидается JSON-список ингредиентов')
+            buffer, started = buffer[1:], True
+        while True:
+            position = JSON_SEPARATORS.match(buffer, position).end()
+            if position == len(buffer) or buffer[position] == ']':
+                break
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break
+            yield item
+    if buffer[position:].strip() not in ('', ']'):
+        raise ValueError('Некорректный JSON в конце файла')
+
+
+def read_dataset(dataset):
+    fields = ('name', 'measurement_unit')
+    if dataset.headers and 'name' not in dataset.headers:
+        yield dict(zip(fields, dataset.headers))
+        for row in dataset:
+            yield dict(zip(fields, row))
+    else:
+        yield from dataset.dict
+
+
+def clean_row(row):
+    if not isinstance(row, dict):
+        return None
+    name = str(row.get('name') or '').strip()
+    measurement_unit = str(row.get('measurement_unit') or '').strip()
+    if not name or not measurement_unit:
+        return None
+    if max(len(name), len(measurement_unit)) > RECIPE_MODEL_MAX_LEN:
+        return None
+    return name, measurement_unit
+
+
+def load_batch(keys, dry_run, stats):
+    existing = set(Ingredient.objects.filter(
+        name__in={name for name, _ in keys}
+    ).values_list('name', 'measurement_unit'))
+    new = [key for key in keys if key not in existing]
+    stats['skipped'] += len(keys) - len(new)
+    stats['inserted'] += len(new)
+    if new and not dry_run:
+        Ingredient.objects.bulk_create(
+            [
+                Ingredient(name=name, measurement_unit=measurement_unit)
+                for name, measurement_unit in new
+            ],
+            batch_size=INGREDIENT_LOAD_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+
+def load_ingredients(rows, batch_size=INGREDIENT_LOAD_BATCH_SIZE,
+                     dry_run=False):
+    stats = Counter(inserted=0, skipped=0, invalid=0)
+    seen = set()
+    rows = iter(rows)
+    with transaction.atomic():
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            keys = []
+            for row in batch:
+                key = clean_row(row)
+                if key is None:
+                    stats['invalid'] += 1
+                elif key in seen:
+                    stats['skipped'] += 1
+                else:
+                    seen.add(key)
+                    keys.append(key)
+            if keys:
+                load_batch(keys, dry_run, stats)
+        if stats['inserted'] and not dry_run:
+            transaction.on_commit(reset_ingredient_index)
+    return stats
@@ -0,0 +1,116 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from recipe.models import IngredientAmount, Recipe, Tag, User
+from recipe.shopping_list import shopping_list_items
+from user.models import Follow
+
+from foodgram.settings import RECIPE_ON_PAGE, RECIPES_LIMIT
+
+
+def hot_queries(user):
+    recipes = Recipe.recipes.with_user_flags(user)
+    recipe_ids = list(recipes.values_list('id', flat=True)[:RECIPE_ON_PAGE])
+    author_ids = list(Follow.objects.filter(
+        user=user
+    ).values_list('following_id', flat=True)[:RECIPE_ON_PAGE])
+    tags = list(Tag.objects.values_list('slug', flat=True)[:2])
+    return {
+        'recipe feed': recipes[:RECIPE_ON_PAGE],
+        'recipe feed, cursor': recipes.order_by('-created_at', '-id').filter(
+            Q(created_at__lt=timezone.now())
+            | Q(created_at=timezone.now(), id__lt=0)
+        )[:RECIPE_ON_PAGE + 1],
+        'recipes by author': recipes.recipe_filter(
+            user=user, author=user.id
+        )[:RECIPE_ON_PAGE],
+        'favorite recipes': recipes.recipe_filter(
+            user=user, is_favorite=True
+        )[:RECIPE_ON_PAGE],
+        'recipes in cart': recipes.recipe_filter(
+            user=user, in_cart=True
+        )[:RECIPE_ON_PAGE],
+        'recipes by tags': recipes.recipe_tag_filter(
+            tags=tags or ['breakfast']
+        )[:RECIPE_ON_PAGE],
+        'combined filters': recipes.recipe_filter(
+            user=user, is_favorite=True, in_cart=True, author=user.id,
+            tags=tags or ['breakfast']
+        )[:RECIPE_ON_PAGE],
+        'recipe ingredients': IngredientAmount.objects.filter(
+            recipe__in=recipe_ids or [0]
+        ).select_related('ingredients'),
+        'shopping list': shopping_list_items(user),
+        'followed authors': Follow.objects.filter(
+            user=user
+        ).values_list('following_id', flat=True),
+        'subscriptions': User.objects.filter(
+            following__user=user
+        ).order_by('id')[:RECIPE_ON_PAGE],
+        'latest recipes per author': Recipe.recipes.latest_per_author(
+            RECIPES_LIMIT
+        ).filter(author__in=author_ids or [0]),
+    }
+
+
+def explain(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        return cursor.fetchone()[0][0]['Plan']
+
+
+def seq_scans(plan):
+    if plan.get('Node Type') == 'Seq Scan':
+        yield plan['Relation Name']
+    for subplan in plan.get('Plans', ()):
+        yield from seq_scans(subplan)
+
+
+class Command(BaseCommand):
+    help = ('Проверяет через EXPLAIN планы основных запросов API '
+            'и падает, если какой-то из них читает таблицу целиком')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int,
+            help='id пользователя, для которого строятся запросы'
+        )
+        parser.add_argument(
+            '--plans', action='store_true',
+            help='вывести полный план каждого запроса'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Планы запросов проверяются в PostgreSQL')
+        users = User.objects.order_by('id')
+        if options['user']:
+            users = users.filter(id=options['user'])
+        user = users.first()
+        if user is None:
+            raise CommandError('Нет пользователей: заполните базу данных')
+        failed = []
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            for name, queryset in hot_queries(user).items():
+                plan = explain(queryset)
+                scans = list(seq_scans(plan))
+                if options['plans']:
+                    self.stdout.write(json.dumps(plan, indent=2))
+                if scans:
+                    failed.append(name)
+                    self.stdout.write(self.style.ERROR(
+                        f'{name}: Seq Scan on {", ".join(scans)}'
+                    ))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'{name}: OK'))
+        if failed:
+            raise CommandError(
+                f'Полное сканирование таблиц в запросах: {", ".join(failed)}'
+            )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from recipe.images import collect_orphans
+
+
+class Command(BaseCommand):
+    help = 'Удаляет изображения, на которые не ссылается ни один рецепт'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='только показать файлы, которые будут удалены'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        orphans = collect_orphans(dry_run=dry_run)
+        if dry_run or options['verbosity'] > 1:
+            for name in orphans:
+                self.stdout.write(name)
+        label = 'Будет удалено' if dry_run else 'Удалено'
+        self.stdout.write(f'{label} файлов: {len(orphans)}')
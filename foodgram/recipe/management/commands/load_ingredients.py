@@ -0,0 +1,52 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recipe.ingredient_loader import load_ingredients, read_csv, read_json
+
+from foodgram.settings import INGREDIENT_LOAD_BATCH_SIZE
+
+READERS = {
+    'csv': read_csv,
+    'json': read_json,
+}
+
+
+class Command(BaseCommand):
+    help = ('Загружает справочник ингредиентов из CSV или JSON, '
+            'пропуская уже существующие')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='путь к ingredients.csv или .json')
+        parser.add_argument(
+            '--format', choices=READERS,
+            help='формат файла, по умолчанию - по расширению'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=INGREDIENT_LOAD_BATCH_SIZE,
+            help='число строк в одной пачке'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='только посчитать, ничего не записывая'
+        )
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or os.path.splitext(
+            options['path']
+        )[1].lstrip('.').lower()
+        if file_format not in READERS:
+            raise CommandError(f'Неизвестный формат файла: {file_format}')
+        try:
+            with open(options['path'], encoding='utf-8', newline='') as file:
+                stats = load_ingredients(
+                    READERS[file_format](file),
+                    batch_size=options['batch_size'],
+                    dry_run=options['dry_run'],
+                )
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            'Добавлено: {inserted}, пропущено: {skipped}, '
+            'с ошибками: {invalid}'.format(**stats)
+        ))
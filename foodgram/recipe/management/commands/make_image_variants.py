@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from recipe.images import save_variants
+from recipe.models import Recipe
+
+
+class Command(BaseCommand):
+    help = ('Строит уменьшенные копии изображений для рецептов, '
+            'у которых их ещё нет')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='перестроить копии и для рецептов, у которых они уже есть'
+        )
+
+    def handle(self, *args, **options):
+        recipes = Recipe.recipes.exclude(image='').order_by('pk')
+        if not options['force']:
+            recipes = recipes.filter(image_variants={})
+        built = failed = 0
+        for recipe in recipes.only('pk', 'image').iterator():
+            variants = save_variants(recipe.image, overwrite=options['force'])
+            if not variants:
+                failed += 1
+                continue
+            Recipe.recipes.filter(pk=recipe.pk).update(
+                image_variants=variants, updated_at=timezone.now()
+            )
+            built += 1
+        self.stdout.write(f'Построено: {built}, с ошибками: {failed}')
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipe.counters import repair_counters
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает счётчики избранного, списков покупок, '
+            'рецептов и подписчиков и исправляет расхождения')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='только показать число расхождений, ничего не меняя'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            for model, counter, drifted in repair_counters(
+                options['dry_run']
+            ):
+                self.stdout.write(
+                    f'{model._meta.label}.{counter}: {drifted}'
+                )
@@ -0,0 +1,313 @@
+import csv
+import datetime
+import io
+import random
+import time
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from recipe.counters import repair_counters
+from recipe.ingredient_index import reset_ingredient_index
+from recipe.models import (Cart, Favorites, Ingredient, IngredientAmount,
+                           Recipe, Tag)
+from recipe.versions import TAGS_VERSION_KEY, reset_versions
+from user.models import Follow, FoodgramUser
+
+WORDS = (
+    'добавить соль перец масло нарезать обжарить варить минут до готовности '
+    'смешать тесто духовка градусов подавать горячим сковорода луком '
+    'чесноком зеленью сметаной остудить выложить посыпать сыром'
+).split()
+SEED_IMAGE = 'recipe_images/seed.png'
+SEED_PASSWORD = 'seed-password'
+SEED_MODELS = (
+    FoodgramUser, Tag, Recipe, Recipe.tags.through, IngredientAmount,
+    Follow, Favorites, Cart,
+)
+
+
+def zipf_weights(size, exponent=1.0):
+    return list(accumulate(1 / (rank + 1) ** exponent for rank in range(size)))
+
+
+class Skewed:
+    def __init__(self, rng, values, exponent=1.0):
+        self.rng = rng
+        self.values = list(values)
+        rng.shuffle(self.values)
+        self.weights = zipf_weights(len(self.values), exponent)
+
+    def choice(self):
+        return self.rng.choices(self.values, cum_weights=self.weights)[0]
+
+    def sample(self, count, exclude=None):
+        available = len(self.values) - (1 if exclude is not None else 0)
+        count = min(count, available)
+        chosen = set()
+        while len(chosen) < count:
+            for value in self.rng.choices(
+                self.values, cum_weights=self.weights, k=count
+            ):
+                if value != exclude:
+                    chosen.add(value)
+        return list(chosen)[:count]
+
+
+def insert_rows(model, fields, rows):
+    if not rows:
+        return
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    columns = ', '.join(
+        quote(model._meta.get_field(name).column) for name in fields
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            cursor.copy_expert(
+                f'COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)',
+                buffer,
+            )
+        else:
+            placeholders = ', '.join(['%s'] * len(fields))
+            cursor.executemany(
+                f'INSERT INTO {table} ({columns}) VALUES ({placeholders})',
+                rows,
+            )
+
+
+def next_id(model):
+    return (model._default_manager.aggregate(
+        last=Max('pk')
+    )['last'] or 0) + 1
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими пользователями, рецептами, '
+            'подписками, избранным и списками покупок для нагрузочных тестов')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users', type=int, default=1000,
+            help='число новых пользователей'
+        )
+        parser.add_argument(
+            '--recipes', type=int, default=10000,
+            help='число новых рецептов'
+        )
+        parser.add_argument(
+            '--tags', type=int, default=10,
+            help='сколько всего тегов должно быть в базе'
+        )
+        parser.add_argument(
+            '--follows', type=int, default=5,
+            help='среднее число подписок на пользователя'
+        )
+        parser.add_argument(
+            '--favorites', type=int, default=10,
+            help='среднее число избранных рецептов на пользователя'
+        )
+        parser.add_argument(
+            '--cart', type=int, default=3,
+            help='среднее число рецептов в списке покупок'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='зерно генератора: одинаковое зерно даёт одинаковые данные'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='число строк в одном INSERT'
+        )
+        parser.add_argument(
+            '--prefix', default='seed',
+            help='префикс имён создаваемых пользователей'
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        ingredient_ids = list(
+            Ingredient.objects.order_by('id').values_list('id', flat=True)
+        )
+        if not ingredient_ids:
+            raise CommandError(
+                'Нет ингредиентов: сначала выполните load_ingredients'
+            )
+        if FoodgramUser.objects.filter(
+            username__startswith=options['prefix']
+        ).exists():
+            raise CommandError(
+                f'Пользователи с префиксом {options["prefix"]} уже есть: '
+                'укажите другой --prefix'
+            )
+        started = time.monotonic()
+        users = self.stage('users', self.create_users, options)
+        tags = self.stage('tags', self.create_tags, options['tags'])
+        recipes = self.stage(
+            'recipes', self.create_recipes, options['recipes'],
+            users, tags, ingredient_ids
+        )
+        self.stage('follows', self.create_follows, users, options)
+        self.stage(
+            'favorites', self.create_user_recipes, Favorites, users,
+            recipes, options['favorites']
+        )
+        self.stage(
+            'cart', self.create_user_recipes, Cart, users, recipes,
+            options['cart']
+        )
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), SEED_MODELS
+            ):
+                cursor.execute(sql)
+        list(repair_counters())
+        reset_ingredient_index()
+        reset_versions(TAGS_VERSION_KEY)
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.monotonic() - started:.1f} с'
+        ))
+
+    def stage(self, name, method, *args):
+        started = time.monotonic()
+        result, created = method(*args)
+        self.stdout.write(
+            f'{name}: {created} за {time.monotonic() - started:.1f} с'
+        )
+        return result
+
+    def batches(self, first_id, count):
+        for start in range(first_id, first_id + count, self.batch_size):
+            yield range(start, min(start + self.batch_size,
+                                   first_id + count))
+
+    def timestamp(self, value):
+        return connection.ops.adapt_datetimefield_value(value)
+
+    def created_at(self, position, count):
+        return self.timestamp(self.now - datetime.timedelta(
+            days=365 * (1 - position / max(count, 1)),
+            seconds=self.rng.randrange(3600),
+        ))
+
+    def create_users(self, options):
+        first_id, count = next_id(FoodgramUser), options['users']
+        password = make_password(SEED_PASSWORD)
+        prefix = options['prefix']
+        joined = self.timestamp(self.now)
+        for ids in self.batches(first_id, count):
+            insert_rows(FoodgramUser, (
+                'id', 'username', 'email', 'first_name', 'last_name',
+                'password', 'is_superuser', 'is_staff', 'is_active',
+                'date_joined', 'recipes_count', 'followers_count',
+            ), [
+                (
+                    pk, f'{prefix}{pk}', f'{prefix}{pk}@example.com',
+                    f'Имя{pk}', f'Фамилия{pk}', password, False, False, True,
+                    joined, 0, 0,
+                ) for pk in ids
+            ])
+        return range(first_id, first_id + count), count
+
+    def create_tags(self, count):
+        tag_ids = list(Tag.objects.values_list('id', flat=True))
+        first_id = next_id(Tag)
+        new_ids = range(first_id, first_id + max(count - len(tag_ids), 0))
+        insert_rows(Tag, ('id', 'name', 'slug', 'color'), [
+            (pk, f'Тег {pk}', f'tag-{pk}', '#{:06X}'.format(0xFFFFFF - pk))
+            for pk in new_ids
+        ])
+        return tag_ids + list(new_ids), len(new_ids)
+
+    def create_recipes(self, count, users, tags, ingredient_ids):
+        authors = Skewed(self.rng, users, exponent=0.8)
+        tag_choice = Skewed(self.rng, tags, exponent=0.7)
+        ingredients = Skewed(self.rng, ingredient_ids)
+        first_id = next_id(Recipe)
+        amount_id = next_id(IngredientAmount)
+        created = 0
+        for ids in self.batches(first_id, count):
+            recipes, recipe_tags, amounts = [], [], []
+            for pk in ids:
+                created_at = self.created_at(pk - first_id, count)
+                recipes.append((
+                    pk, authors.choice(), f'Рецепт {pk}',
+                    ' '.join(self.rng.choices(
+                        WORDS, k=self.rng.randint(20, 120)
+                    )).capitalize(),
+                    self.rng.randint(5, 180), SEED_IMAGE,
+                    created_at, created_at, 0, 0, '{}',
+                ))
+                recipe_tags.extend(
+                    (pk, tag_id)
+                    for tag_id in tag_choice.sample(self.rng.randint(1, 3))
+                )
+                for ingredient_id in ingredients.sample(
+                    self.rng.randint(3, 12)
+                ):
+                    amounts.append((
+                        amount_id, pk, ingredient_id,
+                        self.rng.randint(1, 500),
+                    ))
+                    amount_id += 1
+            insert_rows(Recipe, (
+                'id', 'author', 'name', 'text', 'cooking_time', 'image',
+                'created_at', 'updated_at', 'favorites_count',
+                'in_cart_count', 'image_variants',
+            ), recipes)
+            insert_rows(Recipe.tags.through, ('recipe', 'tag'), recipe_tags)
+            insert_rows(
+                IngredientAmount,
+                ('id', 'recipe', 'ingredients', 'amount'),
+                amounts,
+            )
+            created += len(recipes) + len(recipe_tags) + len(amounts)
+        return range(first_id, first_id + count), created
+
+    def mean_count(self, mean):
+        if mean <= 0:
+            return 0
+        return min(int(self.rng.expovariate(1 / mean)), mean * 20)
+
+    def create_follows(self, users, options):
+        authors = Skewed(self.rng, users, exponent=0.8)
+        follows = []
+        created = 0
+        for user_id in users:
+            follows.extend(
+                (user_id, author_id)
+                for author_id in authors.sample(
+                    self.mean_count(options['follows']), exclude=user_id
+                )
+            )
+            if len(follows) >= self.batch_size:
+                insert_rows(Follow, ('user', 'following'), follows)
+                created, follows = created + len(follows), []
+        insert_rows(Follow, ('user', 'following'), follows)
+        return None, created + len(follows)
+
+    def create_user_recipes(self, model, users, recipes, mean):
+        popular = Skewed(self.rng, recipes, exponent=0.9)
+        added = self.timestamp(self.now)
+        rows = []
+        created = 0
+        for user_id in users:
+            rows.extend(
+                (user_id, recipe_id, added)
+                for recipe_id in popular.sample(self.mean_count(mean))
+            )
+            if len(rows) >= self.batch_size:
+                insert_rows(model, ('user', 'recipe', 'created_at'), rows)
+                created, rows = created + len(rows), []
+        insert_rows(model, ('user', 'recipe', 'created_at'), rows)
+        return None, created + len(rows)
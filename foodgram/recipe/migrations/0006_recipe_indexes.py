@@ -0,0 +1,57 @@
+from django.db import migrations, models
+
+from recipe.migrations_utils import AddIndexConcurrently
+
+NAME_INDEXES = (
+    ('recipe_recipe_name_525dc297', '("name")'),
+    ('recipe_recipe_name_525dc297_like', '("name" varchar_pattern_ops)'),
+)
+
+
+def drop_name_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in NAME_INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+def create_name_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, columns in NAME_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" '
+            f'ON "recipe_recipe" {columns}'
+        )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('recipe', '0005_recipe_updated_at'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='recipe',
+                    name='name',
+                    field=models.CharField(max_length=64, verbose_name='Название блюда'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(drop_name_indexes, create_name_indexes),
+            ],
+        ),
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(fields=['author', '-created_at'], name='recipe_author_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(fields=['-created_at', '-id'], name='recipe_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:48
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_related(apps, model, counter, source, field):
+    Model = apps.get_model(*model.split('.'))
+    Source = apps.get_model(*source.split('.'))
+    Model._default_manager.update(**{counter: Coalesce(Subquery(
+        Source._default_manager.filter(
+            **{field: OuterRef('pk')}
+        ).order_by().values(field).annotate(
+            total=Count('pk')
+        ).values('total')
+    ), 0)})
+
+
+def fill_counters(apps, schema_editor):
+    count_related(
+        apps, 'recipe.Recipe', 'favorites_count', 'recipe.Favorites', 'recipe'
+    )
+    count_related(
+        apps, 'recipe.Recipe', 'in_cart_count', 'recipe.Cart', 'recipe'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe', '0006_recipe_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='В избранном'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='in_cart_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='В списках покупок'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
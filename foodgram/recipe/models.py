@@ -1,6 +1,9 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MinLengthValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
+
+from recipe.storage import recipe_image_storage
 
 from foodgram.settings import RECIPE_MODEL_MAX_LEN, HEX_LEN, HEX_DEFAULT_COLOR
 
@@ -8,23 +11,90 @@ from foodgram.settings import RECIPE_MODEL_MAX_LEN, HEX_LEN, HEX_DEFAULT_COLOR
 User = get_user_model()
 
 
+def recipe_prefetches():
+    return (
+        'tags',
+        models.Prefetch(
+            'ingredients_in_recipe',
+            queryset=IngredientAmount.objects.select_related(
+                'ingredients'
+            ).order_by('ingredients__name'),
+            to_attr='ingredient_amounts',
+        ),
+    )
+
+
 class RecipyQuerySet(models.QuerySet):
     def recipe_filter(
             self, user,
-            **kwargs
+            is_favorite=False, in_cart=False, author=None, tags=()
     ):
-        for flag, value in kwargs.items():
-            if flag == 'is_favorite' and value:
-                return self.filter(favorite_recipe__user=user)
-            elif flag == 'in_cart' and value:
-                return self.filter(in_cart__user=user)
-            elif flag == 'author' and value:
-                return self.filter(author=value)
-        return self
+        if (is_favorite or in_cart) and user.is_anonymous:
+            return self.none()
+        queryset = self
+        if is_favorite:
+            queryset = queryset.filter(models.Exists(Favorites.objects.filter(
+                recipe=models.OuterRef('pk'), user=user
+            )))
+        if in_cart:
+            queryset = queryset.filter(models.Exists(Cart.objects.filter(
+                recipe=models.OuterRef('pk'), user=user
+            )))
+        if author:
+            queryset = queryset.filter(author=author)
+        return queryset.recipe_tag_filter(tags)
+
+    def with_user_flags(self, user):
+        if user.is_anonymous:
+            return self.annotate(
+                is_favorited=models.Value(
+                    False, output_field=models.BooleanField()
+                ),
+                is_in_shopping_cart=models.Value(
+                    False, output_field=models.BooleanField()
+                ),
+            )
+        return self.annotate(
+            is_favorited=models.Exists(Favorites.objects.filter(
+                recipe=models.OuterRef('pk'), user=user
+            )),
+            is_in_shopping_cart=models.Exists(Cart.objects.filter(
+                recipe=models.OuterRef('pk'), user=user
+            )),
+        )
+
+    def with_related(self):
+        return self.select_related('author').prefetch_related(
+            *recipe_prefetches()
+        )
+
+    def latest_per_author(self, limit):
+        latest = Recipe.recipes.filter(
+            author=models.OuterRef('author')
+        ).values('pk')[:limit]
+        return self.filter(pk__in=models.Subquery(latest))
+
+    def touch(self):
+        """Отметка ставится после коммита, чтобы Last-Modified и ETag не
+        оказались старше момента, когда изменения стали видны. Рецепты
+        выбираются сразу: после коммита связи могут быть уже удалены."""
+        self.model.recipes.touch_on_commit(
+            *self.values_list('pk', flat=True)
+        )
+
+    def touch_on_commit(self, *pks):
+        if pks:
+            transaction.on_commit(lambda: self.model.recipes.filter(
+                pk__in=pks
+            ).update(updated_at=timezone.now()))
 
     def recipe_tag_filter(self, tags):
         if tags:
-            return self.filter(tags__slug__in=tags).distinct()
+            return self.filter(models.Exists(
+                Recipe.tags.through.objects.filter(
+                    recipe=models.OuterRef('pk'), tag__slug__in=tags
+                )
+            ))
         else:
             return self
 
@@ -92,7 +162,6 @@ class Recipe(models.Model):
         verbose_name='Название блюда',
         max_length=RECIPE_MODEL_MAX_LEN,
         null=False,
-        db_index=True,
     )
     author = models.ForeignKey(
         User,
@@ -115,9 +184,19 @@ class Recipe(models.Model):
         auto_now_add=True,
         editable=False,
     )
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True,
+    )
     image = models.ImageField(
         verbose_name='Внешний вид блюда',
         upload_to='recipe_images/',
+        storage=recipe_image_storage,
+    )
+    image_variants = models.JSONField(
+        verbose_name='Уменьшенные копии изображения',
+        default=dict,
+        editable=False,
     )
     text = models.TextField(
         verbose_name='Описание блюда',
@@ -129,6 +208,16 @@ class Recipe(models.Model):
             MinValueValidator(1, 'Меньше минуты - не рецепт!')
         ]
     )
+    favorites_count = models.PositiveIntegerField(
+        verbose_name='В избранном',
+        default=0,
+        editable=False,
+    )
+    in_cart_count = models.PositiveIntegerField(
+        verbose_name='В списках покупок',
+        default=0,
+        editable=False,
+    )
     recipes = RecipyQuerySet.as_manager()
 
     class Meta:
@@ -136,6 +225,17 @@ class Recipe(models.Model):
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
         ordering = ('-created_at', )
+        indexes = [
+            models.Index(
+                fields=('author', '-created_at'),
+                name='recipe_author_created_idx',
+            ),
+            models.Index(
+                fields=('-created_at', '-id'),
+                name='recipe_created_id_idx',
+            ),
+            models.Index(fields=('image',), name='recipe_image_idx'),
+        ]
 
     def __str__(self):
         return f'{self.name}. Автор: {self.author.username}'
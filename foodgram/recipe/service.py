@@ -1,41 +1,75 @@
 from django.core.exceptions import ValidationError
+from django.db.models import CharField, Value
 
 from recipe.models import Ingredient, IngredientAmount, Tag
 
 
-def ingredient_amount(recipe, ingredients):
-    ingredient_amount = []
-    for ingredient, amount in ingredients.values():
-        ingredient_amount.append(IngredientAmount(
-            recipe=recipe,
-            ingredients=ingredient,
-            amount=amount
-        ))
-    IngredientAmount.objects.bulk_create(ingredient_amount)
+def ingredient_amount(recipe, ingredients, created=False):
+    """Приводит ингредиенты рецепта к ingredients ({id: количество}):
+    удаляет лишние строки, меняет изменившиеся и добавляет новые."""
+    current = {} if created else {
+        row.ingredients_id: row
+        for row in recipe.ingredients_in_recipe.only(
+            'pk', 'ingredients_id', 'amount'
+        )
+    }
+    removed = [
+        row.pk for pk, row in current.items() if pk not in ingredients
+    ]
+    changed = []
+    for pk, row in current.items():
+        if pk in ingredients and row.amount != ingredients[pk]:
+            row.amount = ingredients[pk]
+            changed.append(row)
+    if removed:
+        IngredientAmount.objects.filter(pk__in=removed).delete()
+    if changed:
+        IngredientAmount.objects.bulk_update(changed, ('amount', ))
+    IngredientAmount.objects.bulk_create(
+        IngredientAmount(recipe=recipe, ingredients_id=pk, amount=amount)
+        for pk, amount in ingredients.items() if pk not in current
+    )
 
 
-def tags_validator(tags_id, Tag: 'Tag'):
-    exists_tags = Tag.objects.filter(id__in=tags_id)
-    if len(exists_tags) != len(tags_id):
-        raise ValidationError('Такого тэга нет!')
+def object_ids(values, message):
+    try:
+        return {int(value) for value in values}
+    except (TypeError, ValueError):
+        raise ValidationError(message)
 
 
-def ingredients_validator(ingredients, Ingredient: 'Ingredient'):
+def ingredients_validator(ingredients):
     validated_ingredients = {}
     for ing in ingredients:
-        if not str(ing['amount']).isdigit():
+        if not isinstance(ing, dict) or 'id' not in ing:
+            raise ValidationError('Неправильные ингидиенты')
+        if not str(ing.get('amount')).isdigit():
             raise ValidationError('Количество измеряется в числах!')
-        amount = validated_ingredients.get(ing['id'], 0) + int(ing['amount'])
+        pk, = object_ids((ing['id'], ), 'Неправильные ингидиенты')
+        amount = validated_ingredients.get(pk, 0) + int(ing['amount'])
         if amount <= 0:
             raise ValidationError('Неправильное количество ингридиента')
-        validated_ingredients[ing['id']] = amount
+        validated_ingredients[pk] = amount
     if not validated_ingredients:
         raise ValidationError('Нужны ингридиенты!')
-    db_validated_ingredients = Ingredient.objects.filter(
-        pk__in=validated_ingredients.keys()
-    )
-    if not db_validated_ingredients:
-        raise ValidationError('Неправильные ингидиенты')
-    for ing in db_validated_ingredients:
-        validated_ingredients[ing.pk] = (ing, validated_ingredients[ing.pk])
     return validated_ingredients
+
+
+def recipe_validator(tags, ingredients):
+    """Проверяет теги и ингредиенты рецепта одним запросом."""
+    tags = object_ids(tags, 'Такого тэга нет!')
+    ingredients = ingredients_validator(ingredients)
+    kind = CharField()
+    found = set(Tag.objects.filter(pk__in=tags).annotate(
+        kind=Value('tag', output_field=kind)
+    ).values_list('kind', 'pk').order_by().union(
+        Ingredient.objects.filter(pk__in=ingredients.keys()).annotate(
+            kind=Value('ingredient', output_field=kind)
+        ).values_list('kind', 'pk').order_by(),
+        all=True,
+    ))
+    if any(('tag', pk) not in found for pk in tags):
+        raise ValidationError('Такого тэга нет!')
+    if any(('ingredient', pk) not in found for pk in ingredients):
+        raise ValidationError('Неправильные ингидиенты')
+    return tags, ingredients
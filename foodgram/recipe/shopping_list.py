@@ -0,0 +1,118 @@
+import csv
+import datetime
+import hashlib
+import io
+
+from django.core.cache import cache
+from django.db.models import F, Sum
+from PIL import Image, ImageDraw, ImageFont
+
+from recipe.models import IngredientAmount
+from recipe.versions import get_version, reset_versions
+
+from foodgram.settings import (SHOPPING_LIST_CACHE_TIMEOUT,
+                               SHOPPING_LIST_FONT)
+
+CART_VERSION_KEY = 'cart_version:{}'
+SHOPPING_LIST_KEY = 'shopping_list:{}'
+PDF_PAGE_SIZE = (827, 1169)
+PDF_MARGIN = 60
+PDF_FONT_SIZE = 18
+
+
+def shopping_list_items(user):
+    return IngredientAmount.objects.filter(
+        recipe__in_cart__user=user
+    ).values(
+        name=F('ingredients__name'),
+        measurement_unit=F('ingredients__measurement_unit'),
+    ).annotate(amount=Sum('amount')).order_by(
+        'name', 'measurement_unit'
+    )
+
+
+def shopping_list_footer():
+    today = datetime.date.today()
+    return f'Foodgram by Samiel19, {today.strftime("%b-%d-%Y")}'
+
+
+def shopping_list(user):
+    for i, item in enumerate(shopping_list_items(user).iterator()):
+        yield (f"{i + 1}. {item['name']}: {item['amount']}"
+               f" {item['measurement_unit']}\n")
+    yield f'\n{shopping_list_footer()}'
+
+
+def render_txt(user):
+    return ''.join(shopping_list(user)).encode()
+
+
+def render_csv(user):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(('name', 'measurement_unit', 'amount'))
+    for item in shopping_list_items(user).iterator():
+        writer.writerow(
+            (item['name'], item['measurement_unit'], item['amount'])
+        )
+    return output.getvalue().encode()
+
+
+def render_pdf(user):
+    try:
+        font = ImageFont.truetype(SHOPPING_LIST_FONT, PDF_FONT_SIZE)
+    except OSError:
+        font = ImageFont.load_default()
+    line_height = int(PDF_FONT_SIZE * 1.5)
+    lines_on_page = (PDF_PAGE_SIZE[1] - 2 * PDF_MARGIN) // line_height
+    lines = ''.join(shopping_list(user)).splitlines()
+    pages = []
+    for start in range(0, len(lines), lines_on_page):
+        page = Image.new('RGB', PDF_PAGE_SIZE, 'white')
+        draw = ImageDraw.Draw(page)
+        for i, line in enumerate(lines[start:start + lines_on_page]):
+            draw.text(
+                (PDF_MARGIN, PDF_MARGIN + i * line_height),
+                line, fill='black', font=font
+            )
+        pages.append(page)
+    output = io.BytesIO()
+    pages[0].save(
+        output, format='PDF', save_all=True, append_images=pages[1:]
+    )
+    return output.getvalue()
+
+
+RENDERERS = {
+    'txt': render_txt,
+    'csv': render_csv,
+    'pdf': render_pdf,
+}
+
+
+def get_cart_version(user):
+    return get_version(CART_VERSION_KEY.format(user.id))
+
+
+def reset_cart_version(*user_ids):
+    reset_versions(*(CART_VERSION_KEY.format(user_id)
+                     for user_id in user_ids))
+
+
+def shopping_list_etag(user, file_format):
+    version = ':'.join((
+        str(user.id),
+        get_cart_version(user),
+        datetime.date.today().isoformat(),
+        file_format,
+    ))
+    return '"{}"'.format(hashlib.md5(version.encode()).hexdigest())
+
+
+def get_shopping_list(user, file_format, etag):
+    key = SHOPPING_LIST_KEY.format(etag.strip('"'))
+    content = cache.get(key)
+    if content is None:
+        content = RENDERERS[file_format](user)
+        cache.set(key, content, SHOPPING_LIST_CACHE_TIMEOUT)
+    return content
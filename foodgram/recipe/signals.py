@@ -0,0 +1,142 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from jobs.queue import enqueue
+from recipe.counters import change_counter, change_counters
+from recipe.ingredient_index import reset_ingredient_index
+from recipe.models import (Cart, Favorites, Ingredient, IngredientAmount,
+                           Recipe, Tag)
+from recipe.shopping_list import reset_cart_version
+from recipe.tasks import collect_image, make_image_variants
+from recipe.versions import TAGS_VERSION_KEY, reset_versions
+from user.models import FoodgramUser, Follow
+
+from foodgram.settings import MEDIA_GC_DELAY
+
+AUTHOR_FIELDS = {'email', 'username', 'first_name', 'last_name'}
+
+
+def reset_cart_version_on_commit(*user_ids):
+    """До коммита параллельный запрос ещё видит старые строки и закэшировал
+    бы их под новой версией, поэтому версия сбрасывается после коммита."""
+    if user_ids:
+        transaction.on_commit(partial(reset_cart_version, *user_ids))
+
+
+@receiver((post_save, post_delete), sender=Cart)
+def cart_changed(sender, instance, **kwargs):
+    reset_cart_version_on_commit(instance.user_id)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_changed(sender, instance, created, **kwargs):
+    if not created:
+        reset_cart_version_on_commit(*Cart.objects.filter(
+            recipe=instance
+        ).values_list('user_id', flat=True))
+
+
+@receiver((post_save, pre_delete), sender=Ingredient)
+def ingredient_changed(sender, instance, **kwargs):
+    transaction.on_commit(reset_ingredient_index)
+    reset_cart_version_on_commit(*Cart.objects.filter(
+        recipe__ingredients=instance
+    ).values_list('user_id', flat=True).distinct())
+    Recipe.recipes.filter(ingredients=instance).touch()
+
+
+def reset_recipe_carts(recipe_id):
+    reset_cart_version(*Cart.objects.filter(
+        recipe_id=recipe_id
+    ).values_list('user_id', flat=True))
+
+
+@receiver((post_save, post_delete), sender=IngredientAmount)
+def amount_cart_changed(sender, instance, **kwargs):
+    """Корзины ищутся после коммита: при удалении рецепта сигнал приходит
+    на каждую строку ингредиентов, и запрос внутри транзакции был бы
+    на каждую из них."""
+    transaction.on_commit(partial(reset_recipe_carts, instance.recipe_id))
+
+
+@receiver((post_save, post_delete), sender=IngredientAmount)
+def ingredient_amount_changed(sender, instance, **kwargs):
+    Recipe.recipes.touch_on_commit(instance.recipe_id)
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def tag_changed(sender, instance, **kwargs):
+    transaction.on_commit(partial(reset_versions, TAGS_VERSION_KEY))
+
+
+@receiver((post_save, pre_delete), sender=Tag)
+def recipe_tag_changed(sender, instance, **kwargs):
+    Recipe.recipes.filter(tags=instance).touch()
+
+
+@receiver(post_save, sender=FoodgramUser)
+def author_changed(sender, instance, created, update_fields, **kwargs):
+    if created or update_fields and not AUTHOR_FIELDS & set(update_fields):
+        return
+    Recipe.recipes.filter(author=instance).touch()
+
+
+@receiver(post_save, sender=Favorites)
+@receiver(post_save, sender=Cart)
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Follow)
+def counted_object_created(sender, instance, created, **kwargs):
+    if created:
+        change_counters(instance, 1)
+
+
+@receiver(post_delete, sender=Favorites)
+@receiver(post_delete, sender=Cart)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Follow)
+def counted_object_deleted(sender, instance, **kwargs):
+    change_counters(instance, -1)
+
+
+@receiver(pre_save, sender=Recipe)
+def recipe_before_save(sender, instance, **kwargs):
+    if instance._state.adding:
+        return
+    saved = Recipe.recipes.filter(pk=instance.pk).values(
+        'author_id', 'image', 'image_variants'
+    ).first() or {}
+    author_id = saved.get('author_id')
+    if author_id != instance.author_id:
+        change_counter(FoodgramUser, 'recipes_count', author_id, -1)
+        change_counter(FoodgramUser, 'recipes_count', instance.author_id, 1)
+    if saved.get('image') != instance.image.name:
+        instance.image_variants = {}
+        release_later(saved.get('image'), saved.get('image_variants'))
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_image_saved(sender, instance, **kwargs):
+    if instance.image and not instance.image_variants:
+        enqueue(
+            make_image_variants, args=(instance.pk,),
+            key=f'image_variants:{instance.pk}',
+        )
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_image_deleted(sender, instance, **kwargs):
+    release_later(instance.image.name, instance.image_variants)
+
+
+def release_later(name, variants):
+    """Файлы могут быть общими для нескольких рецептов, поэтому их
+    удаляет задача, если на них не осталось ссылок."""
+    if name:
+        enqueue(
+            collect_image, args=(name, list((variants or {}).values())),
+            delay=MEDIA_GC_DELAY,
+        )
@@ -0,0 +1,31 @@
+import hashlib
+import os
+import posixpath
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Файл называется по sha256 содержимого: одинаковые загрузки
+    хранятся один раз, а имя никогда не указывает на другие данные."""
+
+    def save(self, name, content, max_length=None):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()
+        name = posixpath.join(
+            posixpath.dirname(name), digest[:2],
+            digest + posixpath.splitext(name)[1].lower(),
+        )
+        if self.exists(name):
+            # Свежая отметка времени защищает файл от сборщика мусора,
+            # пока рецепт с ним ещё не сохранён.
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length)
+
+
+recipe_image_storage = ContentAddressedStorage()
@@ -0,0 +1,34 @@
+from django.utils import timezone
+
+from jobs.queue import task
+from recipe.counters import repair_counters
+from recipe.images import collect_orphans, release_image, save_variants
+from recipe.models import Recipe
+
+
+@task()
+def make_image_variants(recipe_id):
+    recipe = Recipe.recipes.filter(pk=recipe_id).only(
+        'pk', 'image', 'image_variants'
+    ).first()
+    if recipe is None or not recipe.image or recipe.image_variants:
+        return
+    variants = save_variants(recipe.image)
+    Recipe.recipes.filter(
+        pk=recipe_id, image=recipe.image.name
+    ).update(image_variants=variants, updated_at=timezone.now())
+
+
+@task()
+def collect_image(name, variants=()):
+    release_image(name, variants)
+
+
+@task(every=60 * 60 * 24)
+def collect_media_orphans():
+    collect_orphans()
+
+
+@task(every=60 * 60 * 24)
+def repair_recipe_counters():
+    list(repair_counters())
@@ -0,0 +1,18 @@
+import uuid
+
+from django.core.cache import cache
+
+TAGS_VERSION_KEY = 'tags_version'
+INGREDIENTS_VERSION_KEY = 'ingredients_version'
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def reset_versions(*keys):
+    cache.delete_many(keys)
@@ -0,0 +1,105 @@
+import pytest
+
+from django.core.cache import cache
+
+from rest_framework.test import APIClient
+
+from recipe.models import Ingredient, IngredientAmount, Recipe, Tag
+from user.models import FoodgramUser
+
+
+@pytest.fixture(autouse=True)
+def local_storage(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path / 'media')
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+    cache.clear()
+
+
+def make_user(username):
+    return FoodgramUser.objects.create_user(
+        username=username,
+        email=f'{username}@example.com',
+        password='Pa$$w0rd',
+        first_name=username,
+        last_name=username,
+    )
+
+
+@pytest.fixture
+def user(db):
+    return make_user('user')
+
+
+@pytest.fixture
+def another_user(db):
+    return make_user('another')
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+@pytest.fixture
+def user_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def another_client(another_user):
+    client = APIClient()
+    client.force_authenticate(another_user)
+    return client
+
+
+@pytest.fixture
+def tags(db):
+    return [
+        Tag.objects.create(
+            name=f'Тег {number}', color=f'#00000{number}',
+            slug=f'tag{number}',
+        ) for number in range(3)
+    ]
+
+
+@pytest.fixture
+def ingredients(db):
+    Ingredient.objects.bulk_create(
+        Ingredient(name=f'Ингредиент {number:02}', measurement_unit='г')
+        for number in range(40)
+    )
+    return list(Ingredient.objects.order_by('name'))
+
+
+@pytest.fixture
+def make_recipes(user, tags, ingredients):
+    def make_recipes(count, author=None):
+        recipes = []
+        for number in range(count):
+            recipe = Recipe.recipes.create(
+                author=author or user,
+                name=f'Рецепт {number}',
+                text='Описание',
+                cooking_time=10,
+                image='recipe_images/test.png',
+            )
+            recipe.tags.set(tags[:2])
+            IngredientAmount.objects.bulk_create(
+                IngredientAmount(
+                    recipe=recipe, ingredients=ingredient, amount=number + 1
+                ) for ingredient in ingredients[:3]
+            )
+            recipes.append(recipe)
+        return recipes
+    return make_recipes
+
+
+@pytest.fixture
+def recipe(make_recipes):
+    return make_recipes(1)[0]
@@ -0,0 +1,160 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from recipe.models import Cart, Favorites, Recipe
+from user.models import FoodgramUser, Follow
+
+from foodgram.settings import BATCH_MAX_SIZE
+
+pytestmark = pytest.mark.django_db
+
+
+def shopping_list(response):
+    return b''.join(response).decode()
+
+
+def favorites_count(recipe):
+    return Recipe.recipes.get(pk=recipe.pk).favorites_count
+
+
+def test_batch_favorite_reports_every_id(
+    another_client, another_user, make_recipes
+):
+    first, second, third = make_recipes(3)
+    Favorites.objects.create(user=another_user, recipe=third)
+
+    response = another_client.post(
+        '/api/recipes/favorite/',
+        {'ids': [first.id, second.id, first.id, third.id, 100500]},
+        format='json',
+    )
+
+    assert response.status_code == 200
+    assert response.data == {
+        first.id: 'created',
+        second.id: 'created',
+        third.id: 'exists',
+        100500: 'not_found',
+    }
+    assert Favorites.objects.filter(user=another_user).count() == 3
+    assert [favorites_count(recipe) for recipe in (first, second, third)] \
+        == [1, 1, 1]
+
+
+def test_batch_unfavorite_reports_every_id(
+    another_client, another_user, user, make_recipes
+):
+    first, second = make_recipes(2)
+    Favorites.objects.create(user=another_user, recipe=first)
+    Favorites.objects.create(user=user, recipe=first)
+
+    response = another_client.delete(
+        '/api/recipes/favorite/',
+        {'ids': [first.id, second.id, 100500]},
+        format='json',
+    )
+
+    assert response.status_code == 200
+    assert response.data == {
+        first.id: 'deleted',
+        second.id: 'missing',
+        100500: 'not_found',
+    }
+    assert not Favorites.objects.filter(user=another_user).exists()
+    assert favorites_count(first) == 1
+
+
+@pytest.mark.parametrize('method', ['post', 'delete'])
+def test_batch_query_count_ignores_batch_size(
+    another_client, another_user, make_recipes, method
+):
+    recipes = make_recipes(22)
+    if method == 'delete':
+        Favorites.objects.bulk_create(
+            Favorites(user=another_user, recipe=recipe) for recipe in recipes
+        )
+
+    def count_queries(batch):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(another_client, method)(
+                '/api/recipes/favorite/',
+                {'ids': [recipe.id for recipe in batch]},
+                format='json',
+            )
+        assert response.status_code == 200
+        return len(context.captured_queries)
+
+    assert count_queries(recipes[:2]) == count_queries(recipes[2:])
+
+
+def test_batch_cart(
+    another_client, another_user, make_recipes,
+    django_capture_on_commit_callbacks
+):
+    recipes = make_recipes(2)
+    ids = [recipe.id for recipe in recipes]
+    url = '/api/recipes/download_shopping_cart/'
+    assert 'Ингредиент 00' not in shopping_list(another_client.get(url))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = another_client.post(
+            '/api/recipes/shopping_cart/', {'ids': ids}, format='json'
+        )
+    assert response.status_code == 200
+    assert Cart.objects.filter(user=another_user).count() == 2
+    assert 'Ингредиент 00' in shopping_list(another_client.get(url))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = another_client.delete(
+            '/api/recipes/shopping_cart/', {'ids': ids}, format='json'
+        )
+    assert set(response.data.values()) == {'deleted'}
+    assert Recipe.recipes.filter(in_cart_count__gt=0).count() == 0
+    assert 'Ингредиент 00' not in shopping_list(another_client.get(url))
+
+
+def test_batch_follow_forbids_self(another_client, another_user, user):
+    response = another_client.post(
+        '/api/users/subscribe/',
+        {'ids': [user.id, another_user.id]},
+        format='json',
+    )
+
+    assert response.status_code == 200
+    assert response.data == {user.id: 'created', another_user.id: 'forbidden'}
+    assert list(Follow.objects.values_list('user', 'following')) == [
+        (another_user.id, user.id)
+    ]
+    assert FoodgramUser.objects.get(pk=user.pk).followers_count == 1
+
+    response = another_client.delete(
+        '/api/users/subscribe/', {'ids': [user.id]}, format='json'
+    )
+
+    assert response.data == {user.id: 'deleted'}
+    assert not Follow.objects.exists()
+    assert FoodgramUser.objects.get(pk=user.pk).followers_count == 0
+
+
+@pytest.mark.parametrize('ids', [
+    [],
+    ['abc'],
+    [0],
+    list(range(1, BATCH_MAX_SIZE + 2)),
+])
+def test_batch_rejects_invalid_ids(another_client, ids):
+    response = another_client.post(
+        '/api/recipes/favorite/', {'ids': ids}, format='json'
+    )
+
+    assert response.status_code == 400
+    assert not Favorites.objects.exists()
+
+
+def test_batch_requires_authentication(client, recipe):
+    response = client.post(
+        '/api/recipes/favorite/', {'ids': [recipe.id]}, format='json'
+    )
+
+    assert response.status_code == 401
@@ -0,0 +1,46 @@
+import pytest
+
+
+@pytest.mark.django_db
+def test_anonymous_recipe_revalidates_after_favorite(
+    client, another_client, recipe
+):
+    url = f'/api/recipes/{recipe.id}/'
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.data['favorites_count'] == 0
+    assert 'Last-Modified' not in response
+    etag = response['ETag']
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    assert another_client.post(f'{url}favorite/').status_code == 201
+
+    response = client.get(
+        url, HTTP_IF_NONE_MATCH=etag,
+        HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT',
+    )
+    assert response.status_code == 200
+    assert response.data['favorites_count'] == 1
+    response = client.get(
+        url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT'
+    )
+    assert response.status_code == 200
+    assert response.data['favorites_count'] == 1
+
+
+@pytest.mark.django_db
+def test_recipe_revalidates_after_ingredient_amount_delete(
+    client, recipe, django_capture_on_commit_callbacks
+):
+    url = f'/api/recipes/{recipe.id}/'
+    response = client.get(url)
+    etag = response['ETag']
+    assert len(response.data['ingredients']) == 3
+
+    with django_capture_on_commit_callbacks(execute=True):
+        recipe.ingredients_in_recipe.order_by('pk').first().delete()
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert len(response.data['ingredients']) == 2
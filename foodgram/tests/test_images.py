@@ -0,0 +1,50 @@
+import base64
+import io
+import textwrap
+
+import pytest
+from django.core.exceptions import ValidationError
+from PIL import Image
+
+from recipe import images
+
+
+def png_bytes(size=(64, 64)):
+    buffer = io.BytesIO()
+    Image.effect_noise(size, 64).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize('separator', ['\n', '\r\n', ' '])
+def test_decode_wrapped_base64(monkeypatch, separator):
+    monkeypatch.setattr(images, 'BASE64_CHUNK_SIZE', 100)
+    raw = png_bytes()
+    encoded = separator.join(
+        textwrap.wrap(base64.b64encode(raw).decode(), 76)
+    )
+
+    file = images.decode_base64_image(f'data:image/png;base64,{encoded}')
+
+    assert file.read() == raw
+    assert file.size == len(raw)
+
+
+def test_decode_rejects_truncated_base64(monkeypatch):
+    monkeypatch.setattr(images, 'BASE64_CHUNK_SIZE', 100)
+    encoded = base64.b64encode(png_bytes()).decode()[:-1]
+
+    with pytest.raises(ValidationError, match='Некорректное'):
+        images.decode_base64_image(f'data:image/png;base64,{encoded}')
+
+
+def test_decode_checks_decoded_size():
+    raw = png_bytes()
+    encoded = '\n'.join(textwrap.wrap(base64.b64encode(raw).decode(), 76))
+
+    with pytest.raises(ValidationError, match='больше'):
+        images.decode_base64_image(
+            f'data:image/png;base64,{encoded}', max_size=len(raw) - 1
+        )
+    assert images.decode_base64_image(
+        f'data:image/png;base64,{encoded}', max_size=len(raw)
+    ).size == len(raw)
@@ -0,0 +1,90 @@
+import pytest
+
+from recipe.models import Cart, Ingredient, Tag
+from recipe.shopping_list import get_cart_version
+from recipe.versions import (INGREDIENTS_VERSION_KEY, TAGS_VERSION_KEY,
+                             get_version)
+
+
+@pytest.mark.django_db
+def test_cart_version_is_reset_after_commit(
+    user, recipe, django_capture_on_commit_callbacks
+):
+    version = get_cart_version(user)
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        Cart.objects.create(user=user, recipe=recipe)
+        assert get_cart_version(user) == version
+    for callback in callbacks:
+        callback()
+    assert get_cart_version(user) != version
+
+
+@pytest.mark.django_db
+def test_recipe_edit_resets_cart_version_after_commit(
+    user, recipe, django_capture_on_commit_callbacks
+):
+    Cart.objects.create(user=user, recipe=recipe)
+    version = get_cart_version(user)
+    with django_capture_on_commit_callbacks(execute=True):
+        recipe.name = 'Новое название'
+        recipe.save()
+        assert get_cart_version(user) == version
+    assert get_cart_version(user) != version
+
+
+@pytest.mark.django_db
+def test_ingredient_index_is_reset_after_commit(
+    user, recipe, ingredients, django_capture_on_commit_callbacks
+):
+    Cart.objects.create(user=user, recipe=recipe)
+    cart_version = get_cart_version(user)
+    index_version = get_version(INGREDIENTS_VERSION_KEY)
+    with django_capture_on_commit_callbacks(execute=True):
+        Ingredient.objects.filter(pk=ingredients[0].pk).first().save()
+        assert get_cart_version(user) == cart_version
+        assert get_version(INGREDIENTS_VERSION_KEY) == index_version
+    assert get_cart_version(user) != cart_version
+    assert get_version(INGREDIENTS_VERSION_KEY) != index_version
+
+
+@pytest.mark.django_db
+def test_tags_version_is_reset_after_commit(
+    tags, django_capture_on_commit_callbacks
+):
+    version = get_version(TAGS_VERSION_KEY)
+    with django_capture_on_commit_callbacks(execute=True):
+        Tag.objects.create(name='Новый', color='#123456', slug='new')
+        assert get_version(TAGS_VERSION_KEY) == version
+    assert get_version(TAGS_VERSION_KEY) != version
+
+
+@pytest.mark.django_db
+def test_recipe_is_touched_after_commit(
+    recipe, tags, django_capture_on_commit_callbacks
+):
+    updated_at = recipe.updated_at
+    with django_capture_on_commit_callbacks(execute=True):
+        tags[0].delete()
+        recipe.refresh_from_db()
+        assert recipe.updated_at == updated_at
+    recipe.refresh_from_db()
+    assert recipe.updated_at > updated_at
+    assert list(recipe.tags.all()) == tags[1:2]
+
+
+@pytest.mark.django_db
+def test_ingredient_amount_changes_reset_cart_version(
+    user, user_client, recipe, django_capture_on_commit_callbacks
+):
+    Cart.objects.create(user=user, recipe=recipe)
+    url = '/api/recipes/download_shopping_cart/?format=csv'
+    amount = recipe.ingredients_in_recipe.order_by('pk').first()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        amount.amount = 999
+        amount.save()
+    assert '999' in b''.join(user_client.get(url)).decode()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        amount.delete()
+    assert '999' not in b''.join(user_client.get(url)).decode()
@@ -0,0 +1,41 @@
+import pytest
+from django.core.mail import EmailMessage
+
+from jobs import mail, queue
+from jobs.mail import QueuedEmailBackend
+from jobs.models import Job
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def queued(monkeypatch):
+    monkeypatch.setattr(queue, 'JOBS_EAGER', False)
+
+
+def message():
+    return EmailMessage('Тема', 'Текст', 'from@example.com', ['to@ex.com'])
+
+
+def broken_enqueue(*args, **kwargs):
+    raise RuntimeError('очередь недоступна')
+
+
+def test_messages_are_queued():
+    assert QueuedEmailBackend().send_messages([message(), message()]) == 2
+    assert Job.objects.filter(task='jobs.tasks.send_email').count() == 2
+
+
+def test_enqueue_errors_are_raised(monkeypatch):
+    monkeypatch.setattr(mail, 'enqueue', broken_enqueue)
+
+    with pytest.raises(RuntimeError):
+        QueuedEmailBackend().send_messages([message()])
+
+
+def test_fail_silently_hides_enqueue_errors(monkeypatch):
+    monkeypatch.setattr(mail, 'enqueue', broken_enqueue)
+
+    backend = QueuedEmailBackend(fail_silently=True)
+
+    assert backend.send_messages([message()]) == 0
@@ -0,0 +1,55 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from foodgram import metrics
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_DIR', str(tmp_path))
+    return metrics.MetricsRegistry()
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def write_snapshot(directory, pid, count):
+    path = directory / f'{pid}-snapshot.json'
+    path.write_text(json.dumps({
+        'counters': [[
+            metrics.REQUESTS,
+            [['view', 'RecipeViewSet.list'], ['status', '200']],
+            count,
+        ]],
+        'histograms': [],
+    }), encoding='utf-8')
+    return path
+
+
+def test_collect_sums_live_workers_and_removes_dead_ones(
+    registry, tmp_path
+):
+    registry.record_request('RecipeViewSet.list', 200, 0.01, 100)
+    live = write_snapshot(tmp_path, os.getppid(), 5)
+    dead = write_snapshot(tmp_path, dead_pid(), 7)
+    leftover = tmp_path / f'{dead_pid()}-leftover.tmp'
+    leftover.write_text('{}', encoding='utf-8')
+
+    counters, _ = registry.collect()
+
+    key = (
+        metrics.REQUESTS,
+        (('view', 'RecipeViewSet.list'), ('status', '200')),
+    )
+    assert counters[key] == 1 + 5
+    assert live.exists()
+    assert registry.path.exists()
+    assert not dead.exists()
+    assert not leftover.exists()
@@ -0,0 +1,62 @@
+import pytest
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+
+from recipe.management.commands.check_query_plans import seq_scans
+from recipe.models import Cart, Favorites
+from user.models import Follow
+
+
+def test_seq_scans_finds_nested_scans():
+    plan = {
+        'Node Type': 'Nested Loop',
+        'Plans': [
+            {'Node Type': 'Index Scan', 'Relation Name': 'recipe_recipe'},
+            {
+                'Node Type': 'Hash',
+                'Plans': [{
+                    'Node Type': 'Seq Scan',
+                    'Relation Name': 'recipe_cart',
+                }],
+            },
+        ],
+    }
+    assert list(seq_scans(plan)) == ['recipe_cart']
+
+
+postgresql_only = pytest.mark.skipif(
+    connection.vendor != 'postgresql',
+    reason='EXPLAIN (FORMAT JSON) есть только в PostgreSQL',
+)
+
+
+@pytest.mark.django_db
+@postgresql_only
+def test_hot_queries_use_indexes(user, another_user, make_recipes):
+    recipes = make_recipes(3, author=another_user)
+    Favorites.objects.create(user=user, recipe=recipes[0])
+    Cart.objects.create(user=user, recipe=recipes[1])
+    Follow.objects.create(user=user, following=another_user)
+    call_command('check_query_plans', user=user.id)
+
+
+@pytest.mark.django_db
+@postgresql_only
+def test_missing_index_fails_the_check(user, another_user):
+    table = Follow._meta.db_table
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+        for name, constraint in constraints.items():
+            if constraint['columns'][:1] != ['user_id']:
+                continue
+            if constraint['unique']:
+                cursor.execute(
+                    f'ALTER TABLE "{table}" DROP CONSTRAINT "{name}"'
+                )
+            elif constraint['index']:
+                cursor.execute(f'DROP INDEX "{name}"')
+    Follow.objects.create(user=user, following=another_user)
+    with pytest.raises(CommandError, match='followed authors'):
+        call_command('check_query_plans', user=user.id)
@@ -0,0 +1,33 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+def test_tag_filter_uses_exists_without_duplicates(
+    client, make_recipes, tags
+):
+    both = make_recipes(3)
+    other = make_recipes(1)[0]
+    other.tags.set(tags[2:])
+    make_recipes(1)[0].tags.clear()
+
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(
+            f'/api/recipes/?tags={tags[0].slug}&tags={tags[1].slug}'
+            f'&tags={tags[2].slug}'
+        )
+
+    assert response.status_code == 200
+    ids = [recipe['id'] for recipe in response.data['results']]
+    assert sorted(ids) == sorted(recipe.id for recipe in [*both, other])
+    assert response.data['count'] == len(ids)
+    recipe_queries = [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "recipe_recipe"' in query['sql']
+    ]
+    assert recipe_queries
+    for sql in recipe_queries:
+        assert 'DISTINCT' not in sql
+        assert 'EXISTS' in sql
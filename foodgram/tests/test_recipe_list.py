@@ -0,0 +1,49 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from recipe.models import Cart, Favorites
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries), response.data
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('authenticated', (False, True))
+def test_recipe_list_query_count_does_not_depend_on_page_size(
+    authenticated, client, user_client, user, make_recipes
+):
+    recipes = make_recipes(12)
+    for recipe in recipes[::2]:
+        Favorites.objects.create(user=user, recipe=recipe)
+        Cart.objects.create(user=user, recipe=recipe)
+    client = user_client if authenticated else client
+
+    small, small_data = count_queries(client, '/api/recipes/?limit=2')
+    large, large_data = count_queries(client, '/api/recipes/?limit=10')
+
+    assert len(small_data['results']) == 2
+    assert len(large_data['results']) == 10
+    assert small == large
+    flags = {
+        recipe['id']: (recipe['is_favorited'], recipe['is_in_shopping_cart'])
+        for recipe in large_data['results']
+    }
+    favorited = {recipe.id for recipe in recipes[::2]}
+    assert flags == {
+        pk: (authenticated and pk in favorited,) * 2 for pk in flags
+    }
+
+
+@pytest.mark.django_db
+def test_recipe_list_cursor_respects_limit(client, make_recipes):
+    make_recipes(5)
+    response = client.get('/api/recipes/?cursor=&limit=3')
+    assert response.status_code == 200
+    assert len(response.data['results']) == 3
+    assert response.data['next']
@@ -0,0 +1,63 @@
+import pytest
+
+from recipe.models import IngredientAmount
+
+pytestmark = pytest.mark.django_db
+
+
+def patch(client, recipe, tags, ingredients):
+    return client.patch(
+        f'/api/recipes/{recipe.id}/',
+        {'tags': [tag.id for tag in tags], 'ingredients': ingredients},
+        format='json',
+    )
+
+
+def amounts(recipe):
+    return dict(IngredientAmount.objects.filter(
+        recipe=recipe
+    ).values_list('ingredients_id', 'amount'))
+
+
+def test_update_applies_ingredient_diff(
+    user_client, recipe, tags, ingredients
+):
+    kept, changed, removed = ingredients[:3]
+    kept_row = IngredientAmount.objects.get(recipe=recipe, ingredients=kept)
+    added = ingredients[5]
+
+    response = patch(user_client, recipe, tags[1:], [
+        {'id': kept.id, 'amount': 1},
+        {'id': changed.id, 'amount': 7},
+        {'id': added.id, 'amount': 2},
+        {'id': added.id, 'amount': 3},
+    ])
+
+    assert response.status_code == 200, response.data
+    assert amounts(recipe) == {kept.id: 1, changed.id: 7, added.id: 5}
+    assert removed.id not in amounts(recipe)
+    assert IngredientAmount.objects.filter(pk=kept_row.pk).exists()
+    assert set(recipe.tags.values_list('id', flat=True)) == {
+        tag.id for tag in tags[1:]
+    }
+
+
+@pytest.mark.parametrize('ingredients_data', [
+    [{'id': 1}],
+    [{'amount': 3}],
+    ['abc'],
+    [None],
+    [{'id': 'abc', 'amount': 3}],
+    [{'id': 1, 'amount': -1}],
+    [{'id': 1, 'amount': 0}],
+    [{'id': 100500, 'amount': 1}],
+])
+def test_update_rejects_malformed_ingredients(
+    user_client, recipe, tags, ingredients, ingredients_data
+):
+    before = amounts(recipe)
+
+    response = patch(user_client, recipe, tags, ingredients_data)
+
+    assert response.status_code == 400
+    assert amounts(recipe) == before
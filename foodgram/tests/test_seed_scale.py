@@ -0,0 +1,20 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+from recipe.models import Cart, Favorites, Recipe
+from user.models import Follow
+
+
+@pytest.mark.django_db
+def test_seed_scale_without_relations(ingredients):
+    call_command(
+        'seed_scale', users=5, recipes=10, tags=2,
+        cart=0, favorites=0, follows=0, stdout=io.StringIO(),
+    )
+
+    assert Recipe.recipes.count() == 10
+    assert not Cart.objects.exists()
+    assert not Favorites.objects.exists()
+    assert not Follow.objects.exists()
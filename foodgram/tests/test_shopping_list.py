@@ -0,0 +1,56 @@
+import csv
+import io
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from recipe.models import Cart
+
+URL = '/api/recipes/download_shopping_cart/?format=csv'
+
+
+def download(client):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(URL)
+        content = b''.join(response.streaming_content) if (
+            response.streaming
+        ) else response.content
+    assert response.status_code == 200
+    return len(context.captured_queries), list(
+        csv.DictReader(io.StringIO(content.decode()))
+    )
+
+
+@pytest.mark.django_db
+def test_shopping_list_query_count_does_not_depend_on_cart_size(
+    user, user_client, make_recipes, django_capture_on_commit_callbacks
+):
+    recipes = make_recipes(8)
+    with django_capture_on_commit_callbacks(execute=True):
+        Cart.objects.create(user=user, recipe=recipes[0])
+    small, _ = download(user_client)
+    with django_capture_on_commit_callbacks(execute=True):
+        for recipe in recipes[1:]:
+            Cart.objects.create(user=user, recipe=recipe)
+    large, rows = download(user_client)
+    assert small == large
+    assert len(rows) == 3
+
+
+@pytest.mark.django_db
+def test_shopping_list_sums_amounts_in_sql(
+    user, user_client, make_recipes, ingredients
+):
+    recipes = make_recipes(4)
+    for recipe in recipes:
+        Cart.objects.create(user=user, recipe=recipe)
+    _, rows = download(user_client)
+    assert rows == [
+        {
+            'name': ingredient.name,
+            'measurement_unit': ingredient.measurement_unit,
+            'amount': str(1 + 2 + 3 + 4),
+        } for ingredient in ingredients[:3]
+    ]
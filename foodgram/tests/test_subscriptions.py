@@ -0,0 +1,39 @@
+import pytest
+from rest_framework.test import APIRequestFactory
+
+from api.recipes.serializers import FollowSerializer
+from user.models import Follow
+
+pytestmark = pytest.mark.django_db
+
+
+def test_subscriptions_report_requester_follows_author(
+    another_client, another_user, user, recipe
+):
+    Follow.objects.create(user=another_user, following=user)
+
+    response = another_client.get('/api/users/subscriptions/')
+
+    assert response.status_code == 200
+    author, = response.data['results']
+    assert author['id'] == user.id
+    assert author['is_following'] is True
+    assert [item['id'] for item in author['recipes']] == [recipe.id]
+
+
+def test_unannotated_author_uses_request_user(another_user, user):
+    request = APIRequestFactory().get('/')
+    request.user = another_user
+
+    def is_following():
+        return FollowSerializer(
+            user, context={'request': request}
+        ).data['is_following']
+
+    assert is_following() is False
+    Follow.objects.create(user=another_user, following=user)
+    request.__dict__.pop('_following_ids', None)
+    assert is_following() is True
+    assert FollowSerializer(
+        another_user, context={'request': request}
+    ).data['is_following'] is False
@@ -7,11 +7,21 @@ from .models import FoodgramUser, Follow
 class FoodgramUserAdmin(UserAdmin):
     model = FoodgramUser
     list_display = ('id', 'username', 'first_name', 'last_name',
-                    'email', 'password', 'is_staff', 'is_active',)
+                    'email', 'password', 'is_staff', 'is_active',
+                    'recipes_count', 'followers_count',)
     ordering = ('id',)
     search_fields = ('username', 'email',)
-    list_filter = ('username', 'email',)
+    list_filter = ('is_staff', 'is_active',)
+    show_full_result_count = False
+
+
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'following')
+    list_select_related = ('user', 'following')
+    autocomplete_fields = ('user', 'following')
+    search_fields = ('user__username', 'following__username')
+    show_full_result_count = False
 
 
 admin.site.register(FoodgramUser, FoodgramUserAdmin)
-admin.site.register(Follow)
+admin.site.register(Follow, FollowAdmin)
@@ -50,6 +50,16 @@ class FoodgramUser(AbstractUser):
         max_length=USER_MODEL_MAX_LEN,
         help_text='Фамилия пользователя',
     )
+    recipes_count = models.PositiveIntegerField(
+        verbose_name='Рецептов',
+        default=0,
+        editable=False,
+    )
+    followers_count = models.PositiveIntegerField(
+        verbose_name='Подписчиков',
+        default=0,
+        editable=False,
+    )
     username_field = 'email'
 
     class Meta: